@@ -0,0 +1,125 @@
+# benchmarks/bench_backup_jobs.py
+
+"""
+Runs several --backup-jobs jobs (liked songs of different accounts and
+playlists, each into its own worksheet) against fake Spotify and Sheets
+clients, first one job at a time and then all together. Concurrent jobs
+should take about as long as the slowest job, not the sum of all of them.
+
+    python benchmarks/bench_backup_jobs.py --jobs 4 --songs 1000 --latency-ms 50
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+import src.backup_jobs
+from src import profiling
+from src.spotify_pages import SPOTIFY_RATE_LIMITER
+from src.sheet_writer import SHEETS_RATE_LIMITER
+from benchmarks.fakes import FakeSheetsClient, FakeSpreadsheet, FakeWorksheet, FakeSpotify, make_saved_track_items
+from benchmarks.fixtures import build_sheet_values, _unique_names
+
+HEADERS = ("Date Added", "Title", "Artist", "Album", "Spotify Link", "Method Added", "Acquirement Status", "Triaged")
+
+
+def make_args(jobs_config):
+    return argparse.Namespace(
+        client_id="fake", client_secret="fake", redirect_uri="http://localhost", credentials_file="fake.json",
+        full_backup=False, fetch_workers=main.DEFAULT_FETCH_WORKERS, no_incremental=False,
+        batch_size=main.DEFAULT_BATCH_SIZE, jobs_config=jobs_config,
+    )
+
+
+def build_jobs(job_count, song_count, latency, rng):
+    """
+    Returns (jobs config, Spotify client per job, Sheets client, worksheet per job, new songs per job).
+    Even jobs back up an account's liked songs, odd ones a playlist. Each worksheet
+    already holds half of its job's songs.
+    """
+    jobs_config = []
+    spotifies = {}
+    spreadsheet = FakeSpreadsheet()
+    worksheets = {}
+    expected = {}
+    for number in range(job_count):
+        name = f"job{number}"
+        songs = [(f"Artist {number}-{i % 50}", title) for i, title in enumerate(_unique_names(rng, song_count, 2, 4))]
+        items = make_saved_track_items(songs)
+        worksheets[name] = FakeWorksheet(build_sheet_values(songs[:song_count // 2], HEADERS), latency, name, spreadsheet)
+        expected[name] = song_count - song_count // 2
+        entry = {"name": name, "worksheet": name}
+        if number % 2:
+            entry["playlist"] = f"playlist{number}"
+            # Playlists list their tracks oldest first
+            spotifies[name] = FakeSpotify([], latency, {entry["playlist"]: list(reversed(items))})
+        else:
+            spotifies[name] = FakeSpotify(items, latency)
+        jobs_config.append(entry)
+    client = FakeSheetsClient({src.backup_jobs.DEFAULT_SPREADSHEET: spreadsheet}, latency)
+    return jobs_config, spotifies, client, worksheets, expected
+
+
+def run(jobs_config, spotifies, client, names_per_run, show_profile, label):
+    """Runs run_backup_jobs once per entry of `names_per_run` and returns the seconds each run took."""
+    src.backup_jobs.open_spotify = lambda job: spotifies[job.name]
+    main.authenticate_google_sheets = lambda credentials_file: client
+    profiling.reset()
+    times = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for names in names_per_run:
+            # Each run starts with a full rate limit budget, like separate invocations would
+            SPOTIFY_RATE_LIMITER.reset()
+            SHEETS_RATE_LIMITER.reset()
+            start = time.perf_counter()
+            main.run_backup_jobs(make_args(jobs_config), names)
+            times.append(time.perf_counter() - start)
+    if show_profile:
+        print(f"\n[{label}]")
+        profiling.print_report()
+    return times
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="Offline benchmark of concurrent backup jobs.")
+    parser.add_argument("--jobs", type=int, default=4, help="Number of jobs.")
+    parser.add_argument("--songs", type=int, default=1000, help="Liked or playlist songs per job.")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latency of each fake Sheets/Spotify request.")
+    parser.add_argument("--profile", action="store_true", help="Print the per-stage profile of each run.")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable()
+    import spotipy, gspread.utils  # loaded up front so the first run is not charged for it
+    rows = []
+    cwd = os.getcwd()
+    for label, together in (("one at a time", False), ("concurrent", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            # main.py keeps .backup_state.json in the working directory
+            os.chdir(tmp)
+            rng = random.Random(args.songs)
+            jobs_config, spotifies, client, worksheets, expected = build_jobs(args.jobs, args.songs, args.latency_ms / 1000, rng)
+            before = {name: len(worksheet.values) for name, worksheet in worksheets.items()}
+            names_per_run = [None] if together else [[entry["name"]] for entry in jobs_config]
+            times = run(jobs_config, spotifies, client, names_per_run, args.profile, label)
+            added = sum(len(worksheets[name].values) - before[name] for name in worksheets)
+            requests = sum(worksheet.requests for worksheet in worksheets.values()) + sum(sp.requests for sp in spotifies.values())
+            rows.append((label, sum(times), max(times), added, sum(expected.values()), requests))
+            os.chdir(cwd)
+
+    print(f"\n{args.jobs} jobs x {args.songs} songs, {args.latency_ms}ms per request")
+    print(f"{'run':<16}{'seconds':>9}{'added':>15}{'requests':>10}")
+    for label, elapsed, _, added, expected_total, requests in rows:
+        print(f"{label:<16}{elapsed:>9.2f}{f'{added}/{expected_total}':>15}{requests:>10}")
+    print(f"Slowest single job: {rows[0][2]:.2f}s. Concurrent speedup: {rows[0][1] / rows[1][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
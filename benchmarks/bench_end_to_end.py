@@ -0,0 +1,157 @@
+# benchmarks/bench_end_to_end.py
+
+"""
+Runs the --reset-excel, --backup-tracks and --scan-local --mode update flows
+from main.py end to end against a fake worksheet, a fake Spotify client and
+a synthetic library with noisy tags, at several library sizes. Nothing goes
+over the network; --latency-ms adds a delay to every fake API request.
+
+    python benchmarks/bench_end_to_end.py --songs 1000 5000 --profile
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from src import profiling, normalize
+from src.local_scanner import SCAN_STRATEGIES, DEFAULT_SCAN_STRATEGY
+from src.metadata_cache import METADATA_CACHE_FILE
+from src.spotify_pages import SPOTIFY_RATE_LIMITER
+from src.sheet_writer import SHEETS_RATE_LIMITER
+from benchmarks.fakes import FakeWorksheet, FakeSpotify, make_saved_track_items
+from benchmarks.fixtures import build_noisy_library, build_sheet_values, _unique_names
+
+HEADERS = ("Date Added", "Title", "Artist", "Album", "Spotify Link", "Method Added", "Acquirement Status", "Triaged")
+
+
+def make_args(**overrides):
+    args = dict(
+        client_id="fake", client_secret="fake", redirect_uri="http://localhost", credentials_file="fake.json",
+        top=0, full_backup=False, fetch_workers=main.DEFAULT_FETCH_WORKERS, no_incremental=True,
+        scan_path=None, scan_strategy=DEFAULT_SCAN_STRATEGY, mode="update", rebuild_cache=False, workers=main.DEFAULT_WORKERS,
+        batch_size=main.DEFAULT_BATCH_SIZE, local_store="excel",
+        fingerprint=False, fingerprint_seconds=main.FINGERPRINT_SECONDS, resume=False,
+    )
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def count_files(root):
+    return sum(len(files) for _, _, files in os.walk(root))
+
+
+def acquired_count(worksheet, songs):
+    headers = worksheet.values[3]
+    title_col, artist_col = headers.index("Title"), headers.index("Artist")
+    status_col = headers.index("Acquirement Status")
+    expected = set((artist, title) for artist, title in songs)
+    return sum(
+        1 for row in worksheet.values[4:]
+        if len(row) > status_col and row[status_col] == "acquired" and (row[artist_col], row[title_col]) in expected
+    )
+
+
+def run_flow(label, flow, show_profile):
+    """Runs `flow` with its output hidden and returns the elapsed seconds."""
+    profiling.reset()
+    normalize.reset()
+    # Each flow starts with a full rate limit budget, like a separate run of main.py
+    SPOTIFY_RATE_LIMITER.reset()
+    SHEETS_RATE_LIMITER.reset()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        flow()
+    elapsed = time.perf_counter() - start
+    if show_profile:
+        print(f"\n[{label}]")
+        profiling.print_report()
+        normalize.print_hit_rates()
+    return elapsed
+
+
+def bench_scale(song_count, tracks_per_artist, latency, workers, strategies, show_profile):
+    rng = random.Random(song_count)
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # main.py keeps its state files in the working directory
+        os.chdir(tmp)
+        library = os.path.join(tmp, "library")
+        songs = build_noisy_library(library, max(1, song_count // tracks_per_artist), tracks_per_artist, seed=song_count)
+        files = count_files(library)
+        # Sheet rows with no local file, which every scan has to give up on
+        missing = [("Unknown Artist", title) for title in _unique_names(rng, song_count // 10, 3, 4)]
+        sheet_songs = songs + missing
+        rng.shuffle(sheet_songs)
+        values = build_sheet_values(sheet_songs, HEADERS)
+
+        def snapshot(worksheet):
+            return main.SheetSnapshot(worksheet, worksheet.get_all_values())
+
+        # --reset-excel
+        worksheet = FakeWorksheet(values, latency)
+        elapsed = run_flow("reset-excel", lambda: main.run_excel_reset(make_args(), snapshot(worksheet)), show_profile)
+        results.append(("reset-excel", elapsed, len(sheet_songs) / elapsed, "rows/s", worksheet.requests, ""))
+
+        # --backup-tracks: a tenth of the liked songs are new
+        new_songs = [("New Artist", title) for title in _unique_names(rng, max(1, song_count // 10), 3, 4)]
+        liked = rng.sample(songs, min(len(songs), song_count // 2)) + new_songs
+        spotify = FakeSpotify(make_saved_track_items(liked), latency)
+        main.authenticate_spotify = lambda args: spotify
+        worksheet = FakeWorksheet(values, latency)
+        elapsed = run_flow("backup-tracks", lambda: main.run_spotify_backup(make_args(), snapshot(worksheet)), show_profile)
+        appended = len(worksheet.values) - len(values)
+        results.append(("backup-tracks", elapsed, len(liked) / elapsed, "songs/s",
+                        worksheet.requests + spotify.requests, f"{appended}/{len(new_songs)} appended"))
+
+        # --scan-local --mode update per strategy, first with an empty metadata cache and then with a warm one
+        for strategy in strategies:
+            if os.path.exists(METADATA_CACHE_FILE):
+                os.remove(METADATA_CACHE_FILE)
+            for label in (f"scan {strategy} cold", f"scan {strategy} warm"):
+                worksheet = FakeWorksheet(values, latency)
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    main.run_excel_reset(make_args(), snapshot(worksheet))
+                worksheet.requests = 0
+                args = make_args(scan_path=library, workers=workers, scan_strategy=strategy)
+                elapsed = run_flow(label, lambda: main.run_local_scanner(args, snapshot(worksheet)), show_profile)
+                found = acquired_count(worksheet, songs)
+                results.append((label, elapsed, files / elapsed, "files/s", worksheet.requests,
+                                f"{found}/{len(songs)} matched ({100 * found / len(songs):.1f}%)"))
+        os.chdir(cwd)
+    return files, results
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the main flows.")
+    parser.add_argument("--songs", type=int, nargs="+", default=[500, 2000, 5000], help="Library sizes to run.")
+    parser.add_argument("--tracks", type=int, default=10, help="Tracks per artist.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency of each fake Sheets/Spotify request.")
+    parser.add_argument("--workers", type=int, default=main.DEFAULT_WORKERS, help="Tag reading threads for the scan.")
+    parser.add_argument("--scan-strategies", nargs="+", choices=SCAN_STRATEGIES, default=list(SCAN_STRATEGIES))
+    parser.add_argument("--profile", action="store_true", help="Print the per-stage profile of every flow.")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable()
+    # The flows import their libraries on first use; load them up front so no flow is charged for it
+    import openpyxl, gspread.utils, spotipy, tqdm, src.local_scanner, src.tag_readers, src.matcher, src.artist_index
+    rows = []
+    for song_count in args.songs:
+        files, results = bench_scale(song_count, args.tracks, args.latency_ms / 1000, args.workers, args.scan_strategies, args.profile)
+        rows.extend((song_count, files) + result for result in results)
+
+    print(f"\n{'songs':>7}{'files':>7}  {'flow':<20}{'seconds':>9}{'throughput':>14}  {'requests':>8}  notes")
+    for song_count, files, flow, elapsed, rate, unit, requests, notes in rows:
+        print(f"{song_count:>7}{files:>7}  {flow:<20}{elapsed:>9.2f}{rate:>8.0f} {unit:<8}{requests:>7}  {notes}")
+
+
+if __name__ == "__main__":
+    main_bench()
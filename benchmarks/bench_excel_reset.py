@@ -0,0 +1,139 @@
+# benchmarks/bench_excel_reset.py
+
+"""
+Reports wall time and peak RSS of reset_excel_from_google_sheet at several
+sheet sizes, next to the previous in-memory Workbook implementation.
+Each measurement runs in a fresh subprocess so peak RSS is not shared.
+First checks that --sync-excel right after a reset finds nothing to change.
+
+    python benchmarks/bench_excel_reset.py --rows 10000 50000 100000
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import resource
+import subprocess
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEADERS = ["Date Added", "Title", "Artist", "Album", "Spotify Link", "Method Added", "Acquirement Status", "Triaged", "Notes"]
+
+
+class ValuesSheet:
+    def __init__(self, values):
+        self.values = values
+
+    def get_all_values(self):
+        return self.values
+
+
+def make_values(rows):
+    values = [[], [], [], list(HEADERS)]
+    for i in range(rows):
+        row = ["January 29, 2024 at 01:05PM", f"Title {i}", f"Artist {i % 5000}", f"Album {i % 20000}",
+               f"https://open.spotify.com/track/{i:022d}", "Auto Added"]
+        # Every other row is short, as the Sheets API trims trailing empty cells
+        if i % 2:
+            row += ["acquired", "triaged"]
+        values.append(row)
+    return values
+
+
+def in_memory_reset(sheet, file_name):
+    """The previous implementation: a regular Workbook holding every cell."""
+    import openpyxl
+    all_values = sheet.get_all_values()
+    headers = all_values[3]
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Music Saved Tracks"
+    ws.append(headers)
+    for row in all_values[4:]:
+        if len(row) < len(headers):
+            row.extend([''] * (len(headers) - len(row)))
+        ws.append(row)
+    wb.save(file_name)
+
+
+def check_sync_after_reset():
+    """
+    A sheet with a blank data row, and a header row padded with blanks because
+    one data row is wider, must sync cleanly after a reset, run after run.
+    """
+    import io
+    import excel
+    values = make_values(5)
+    values[3] = list(HEADERS) + ['']
+    values[6] = [''] * len(HEADERS)
+    values[7] = values[7] + [''] * (len(HEADERS) - len(values[7])) + ['note']
+    sheet = ValuesSheet(values)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # excel.py works on song-list.xlsx in the working directory
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                excel.reset_excel_from_google_sheet(sheet)
+            for _ in range(2):
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    excel.sync_excel_from_google_sheet(sheet)
+                assert "0 inserted, 0 changed, 0 deleted" in output.getvalue(), output.getvalue()
+        finally:
+            os.chdir(cwd)
+
+
+def max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_child(implementation, rows):
+    import excel
+    sheet = ValuesSheet(make_values(rows))
+    data_rss = max_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp:
+        file_name = os.path.join(tmp, "song-list.xlsx")
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if implementation == "write-only":
+                excel.EXCEL_FILE_NAME = file_name
+                excel.reset_excel_from_google_sheet(sheet)
+            else:
+                in_memory_reset(sheet, file_name)
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(file_name) / (1024 * 1024)
+    print(json.dumps({"seconds": elapsed, "data_rss": data_rss, "peak_rss": max_rss_mb(), "size_mb": size_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel reset memory and time benchmark.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--child", nargs=2, metavar=("IMPLEMENTATION", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return
+
+    check_sync_after_reset()
+    print(f"{'rows':>8}  {'implementation':<12}{'seconds':>10}{'peak RSS MB':>14}{'over data MB':>14}{'file MB':>10}")
+    for rows in args.rows:
+        for implementation in ("in-memory", "write-only"):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", implementation, str(rows)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{rows:>8}  {implementation:<12}{result['seconds']:>10.2f}{result['peak_rss']:>14.0f}"
+                  f"{result['peak_rss'] - result['data_rss']:>14.0f}{result['size_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
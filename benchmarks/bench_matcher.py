@@ -0,0 +1,134 @@
+# benchmarks/bench_matcher.py
+
+"""
+Compares the per-pair thefuzz loop that find_match_in_sheet used to run with
+SongMatcher, matching local files against every sheet row.
+The old loop is timed on a sample of files and extrapolated to --files.
+The normalization rules the matcher relies on are checked first.
+
+    python benchmarks/bench_matcher.py --rows 10000 --files 50000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from thefuzz import fuzz
+from benchmarks.fixtures import WORDS
+from src.matcher import SongMatcher, MATCH_THRESHOLD
+from src.normalize import normalize
+
+# (text, normalized): release noise and credits are dropped, notes naming another recording are kept
+NORMALIZATION_CASES = [
+    ("Hey Jude (Remastered 2015)", "hey jude"),
+    ("Hey Jude - 2015 Remaster", "hey jude"),
+    ("Halo (Radio Edit)", "halo"),
+    ("Halo [Explicit]", "halo"),
+    ("Halo [320kbps]", "halo"),
+    ("Halo [Official Audio]", "halo"),
+    ("Stay (feat. Justin Bieber)", "stay"),
+    ("Stay (with Justin Bieber)", "stay"),
+    ("Stay feat. Justin Bieber", "stay"),
+    ("Little Feat", "little feat"),
+    ("Rather Be (Clean Bandit Remix)", "rather be (clean bandit remix)"),
+    ("Rather Be - Clean Bandit Remix", "rather be - clean bandit remix"),
+    ("Hello (Deluxe Edition Bonus Live)", "hello (deluxe edition bonus live)"),
+    ("Hello (Live with the Orchestra)", "hello (live with the orchestra)"),
+    ("Hello - Live at Wembley", "hello - live at wembley"),
+    ("Hello (Acoustic)", "hello (acoustic)"),
+    ("Hello [Live]", "hello [live]"),
+    ("Hello [Acoustic Version]", "hello [acoustic version]"),
+    ("Rather Be [Clean Bandit Remix]", "rather be [clean bandit remix]"),
+    ("Hello (Clean)", "hello (clean)"),
+    ("Hello (Mono)", "hello (mono)"),
+]
+
+
+def thefuzz_find_match(local_artist, local_title, sheet_songs):
+    """The original pairwise loop from src/local_scanner.py."""
+    best_match = None
+    highest_score = 0
+    for i, song in enumerate(sheet_songs):
+        sheet_title = song.get('Title')
+        sheet_artist = song.get('Artist')
+        if not sheet_title or not sheet_artist:
+            continue
+        title_score = fuzz.ratio(local_title.lower(), sheet_title.lower())
+        artist_score = fuzz.ratio(local_artist.lower(), sheet_artist.lower()) if local_artist else 50
+        score = (title_score * 0.7) + (artist_score * 0.3)
+        if score > highest_score:
+            highest_score = score
+            best_match = (i, song)
+    return best_match, highest_score
+
+
+def add_noise(rng, text):
+    """Simulates tag noise: dropped characters and case changes."""
+    chars = list(text)
+    if len(chars) > 4 and rng.random() < 0.5:
+        del chars[rng.randrange(len(chars))]
+    text = "".join(chars)
+    return text.upper() if rng.random() < 0.1 else text
+
+
+def check_normalization():
+    for text, expected in NORMALIZATION_CASES:
+        assert normalize(text) == expected, (text, normalize(text), expected)
+
+
+def main():
+    check_normalization()
+    parser = argparse.ArgumentParser(description="Fuzzy matcher benchmark.")
+    parser.add_argument("--rows", type=int, default=10000, help="Sheet rows.")
+    parser.add_argument("--files", type=int, default=50000, help="Local files.")
+    parser.add_argument("--sample", type=int, default=100, help="Files timed with the old loop.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sheet_songs = [
+        {'Title': " ".join(rng.sample(WORDS, rng.randint(2, 4))).title(),
+         'Artist': " ".join(rng.sample(WORDS, 2)).title()}
+        for _ in range(args.rows)
+    ]
+    files = []
+    for _ in range(args.files):
+        if rng.random() < 0.5:
+            song = rng.choice(sheet_songs)
+            files.append((add_noise(rng, song['Artist']), add_noise(rng, song['Title'])))
+        else:
+            files.append((" ".join(rng.sample(WORDS, 2)).title(), " ".join(rng.sample(WORDS, 3)).title()))
+
+    sample = files[:args.sample]
+    start = time.perf_counter()
+    old_matches = 0
+    for artist, title in sample:
+        _, score = thefuzz_find_match(artist, title, sheet_songs)
+        old_matches += score > MATCH_THRESHOLD
+    old_per_file = (time.perf_counter() - start) / len(sample)
+
+    start = time.perf_counter()
+    matcher = SongMatcher((i, song['Title'], song['Artist']) for i, song in enumerate(sheet_songs))
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    new_matches = 0
+    sample_matches = 0
+    for i, (artist, title) in enumerate(files):
+        key, _ = matcher.best_match(artist, title)
+        new_matches += key is not None
+        if i < len(sample):
+            sample_matches += key is not None
+    new_seconds = time.perf_counter() - start
+
+    old_seconds = old_per_file * len(files)
+    print(f"{args.rows} sheet rows x {len(files)} files")
+    print(f"thefuzz loop : {old_seconds:10.1f}s (extrapolated from {len(sample)} files, {old_matches} matches in sample)")
+    print(f"SongMatcher  : {new_seconds + build_seconds:10.1f}s ({build_seconds:.2f}s to build, {new_matches} matches, {sample_matches} in sample)")
+    print(f"speedup      : {old_seconds / (new_seconds + build_seconds):10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_scan_workers.py
+
+"""
+Measures how _scan_files scales with the number of tag-reading threads.
+Use --latency-ms to simulate the per-file latency of network storage.
+
+    python benchmarks/bench_scan_workers.py --artists 50 --tracks 20 --latency-ms 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import build_library, build_sheet_values
+import src.local_scanner as local_scanner
+from src.local_scanner import PENDING_PER_WORKER
+from src.song import parseSheetRows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tag extraction worker scaling benchmark.")
+    parser.add_argument("--artists", type=int, default=50)
+    parser.add_argument("--tracks", type=int, default=20, help="Tracks per artist.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency added to each tag read.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    read_tags = local_scanner.get_audio_metadata
+    if args.latency_ms:
+        def slow_read(filepath, *read_args):
+            time.sleep(args.latency_ms / 1000)
+            return read_tags(filepath, *read_args)
+        local_scanner.get_audio_metadata = slow_read
+
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = build_library(tmp, args.artists, args.tracks)
+        values = build_sheet_values(songs)
+        headers = values[3]
+
+        print(f"{len(songs)} files, {args.latency_ms}ms simulated latency")
+        print(f"{'workers':>8}{'seconds':>10}{'files/s':>12}{'speedup':>10}")
+        baseline = None
+        for workers in args.workers:
+            songs_to_find = {song.index: song for song in parseSheetRows(headers, values[4:])}
+            executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+            start = time.perf_counter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+                matches = local_scanner._scan_files(tmp, songs_to_find, None, executor, PENDING_PER_WORKER * workers)
+            elapsed = time.perf_counter() - start
+            if executor is not None:
+                executor.shutdown()
+            baseline = baseline or elapsed
+            print(f"{workers:>8}{elapsed:>10.3f}{len(songs) / elapsed:>12.0f}{baseline / elapsed:>9.1f}x  ({len(matches)} matches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_startup.py
+
+"""
+Measures CLI startup cost with `python -X importtime` and fails when it goes
+over budget. Each case runs in a fresh interpreter; the import time is the
+sum of the top-level imports main.py triggers (the interpreter's own startup
+imports are excluded). A case also fails if it loads one of the heavy
+libraries that only specific actions need.
+
+    python benchmarks/bench_startup.py --budget-ms 60 --runs 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+# Libraries that are loaded only by the actions that need them
+HEAVY_MODULES = ("spotipy", "gspread", "oauth2client", "openpyxl", "mutagen", "rapidfuzz", "unidecode", "tqdm")
+
+CASES = {
+    "--help": [MAIN, "--help"],
+    "no action": [MAIN],
+}
+
+
+def parse_importtime(stderr):
+    """Returns ({top-level module: cumulative µs}, set of every imported module)."""
+    top_level = {}
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # column headings
+        modules.add(name.strip())
+        # Nesting is shown by indentation after the last '|'
+        if not name[1:].startswith(" "):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, modules
+
+
+def interpreter_modules():
+    """Modules the interpreter imports on its own, before main.py runs."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True, cwd=ROOT)
+    return set(parse_importtime(result.stderr)[0])
+
+
+def measure(argv, baseline):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime"] + argv, capture_output=True, text=True, cwd=ROOT)
+    wall = time.perf_counter() - start
+    top_level, modules = parse_importtime(result.stderr)
+    import_us = sum(us for name, us in top_level.items() if name not in baseline)
+    heavy = sorted(m for m in HEAVY_MODULES if m in modules)
+    slowest = sorted(((us, name) for name, us in top_level.items() if name not in baseline), reverse=True)[:5]
+    return wall, import_us / 1000, heavy, slowest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup import time budget check.")
+    parser.add_argument("--budget-ms", type=float, default=60.0, help="Maximum median import time of main.py per case.")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter runs per case; the median is reported.")
+    args = parser.parse_args()
+
+    baseline = interpreter_modules()
+    failed = False
+    print(f"{'case':<12}{'wall ms':>10}{'import ms':>11}  slowest imports")
+    for case, argv in CASES.items():
+        runs = [measure(argv, baseline) for _ in range(args.runs)]
+        wall = statistics.median(run[0] for run in runs)
+        import_ms = statistics.median(run[1] for run in runs)
+        heavy = runs[-1][2]
+        slowest = ", ".join(f"{name} {us / 1000:.1f}" for us, name in runs[-1][3])
+        print(f"{case:<12}{wall * 1000:>10.1f}{import_ms:>11.1f}  {slowest}")
+        if import_ms > args.budget_ms:
+            print(f"  FAIL: import time {import_ms:.1f}ms is over the {args.budget_ms:.0f}ms budget")
+            failed = True
+        if heavy:
+            print(f"  FAIL: loaded {', '.join(heavy)}")
+            failed = True
+    print("FAIL" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
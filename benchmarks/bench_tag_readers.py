@@ -0,0 +1,45 @@
+# benchmarks/bench_tag_readers.py
+
+"""
+Measures tag-read throughput per audio format on synthetic fixture files.
+
+    python benchmarks/bench_tag_readers.py --files 500
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import WRITERS, write_audio_file
+from src.tag_readers import read_tags
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tag reader throughput benchmark.")
+    parser.add_argument("--files", type=int, default=500, help="Number of fixture files per format.")
+    parser.add_argument("--payload-kb", type=int, default=256, help="Size of the fake audio stream per file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'format':<8}{'files':>8}{'seconds':>10}{'files/s':>12}")
+        for ext in WRITERS:
+            paths = []
+            for i in range(args.files):
+                path = os.path.join(tmp, f"track{i}{ext}")
+                write_audio_file(path, f"Artist {i}", f"Title {i}", args.payload_kb * 1024)
+                paths.append(path)
+
+            start = time.perf_counter()
+            for i, path in enumerate(paths):
+                artist, title = read_tags(path)
+                assert (artist, title) == (f"Artist {i}", f"Title {i}"), (path, artist, title)
+            elapsed = time.perf_counter() - start
+            print(f"{ext:<8}{len(paths):>8}{elapsed:>10.3f}{len(paths) / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
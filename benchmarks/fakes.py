@@ -0,0 +1,148 @@
+# benchmarks/fakes.py
+
+"""
+In-memory stand-ins for gspread (client, spreadsheet, worksheet) and a spotipy
+client, so whole flows from main.py can run offline. They count the requests
+they receive and can add a fixed latency per request to mimic the real APIs.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from gspread.utils import a1_to_rowcol
+
+
+class FakeSpreadsheet:
+    def __init__(self, id="fake-spreadsheet"):
+        self.id = id
+        self.modified = 0
+        self.worksheets = []
+
+    def get_lastUpdateTime(self):
+        return f"fake-{self.modified}"
+
+    def worksheet(self, title):
+        for worksheet in self.worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise LookupError(f"no worksheet named {title}")
+
+    def get_worksheet(self, index):
+        return self.worksheets[index]
+
+
+class FakeSheetsClient:
+    """Opens FakeSpreadsheets by name, like gspread.Client.open()."""
+
+    def __init__(self, spreadsheets, latency=0.0):
+        self.spreadsheets = spreadsheets
+        self.latency = latency
+
+    def open(self, name):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.spreadsheets[name]
+
+
+class FakeWorksheet:
+    """
+    Implements the worksheet calls this project makes: get_all_values,
+    append_row(s), update_cell and batch_update. `requests` counts API calls.
+    """
+
+    def __init__(self, values, latency=0.0, title="Sheet1", spreadsheet=None):
+        self.values = [list(row) for row in values]
+        self.latency = latency
+        self.requests = 0
+        self.id = 0
+        self.title = title
+        self.spreadsheet = spreadsheet or FakeSpreadsheet()
+        self.spreadsheet.worksheets.append(self)
+
+    def _request(self, write=False):
+        self.requests += 1
+        if write:
+            self.spreadsheet.modified += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_all_values(self):
+        self._request()
+        return [list(row) for row in self.values]
+
+    def append_rows(self, values, **kwargs):
+        self._request(write=True)
+        self.values.extend(list(row) for row in values)
+
+    def append_row(self, values, **kwargs):
+        self.append_rows([values])
+
+    def update_cell(self, row, col, value):
+        self._request(write=True)
+        self._set_cell(row, col, value)
+
+    def batch_update(self, data, **kwargs):
+        self._request(write=True)
+        for update in data:
+            start_row, start_col = a1_to_rowcol(update['range'].split(':')[0])
+            for row_offset, row_values in enumerate(update['values']):
+                for col_offset, value in enumerate(row_values):
+                    self._set_cell(start_row + row_offset, start_col + col_offset, value)
+
+    def _set_cell(self, row, col, value):
+        while len(self.values) < row:
+            self.values.append([])
+        row_values = self.values[row - 1]
+        if len(row_values) < col:
+            row_values.extend([''] * (col - len(row_values)))
+        row_values[col - 1] = '' if value is None else str(value)
+
+
+def make_saved_track_items(songs, start=datetime(2024, 1, 1, tzinfo=timezone.utc)):
+    """Saved track items for (artist, title) pairs, newest first; the last pair is the oldest like."""
+    items = []
+    for number, (artist, title) in enumerate(songs):
+        added_at = start + timedelta(minutes=number)
+        items.append({
+            'added_at': added_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'track': {
+                'name': title,
+                'uri': f"spotify:track:{number:022d}",
+                'artists': [{'name': artist}],
+                'album': {'name': 'Album'},
+            },
+        })
+    items.reverse()
+    return items
+
+
+class FakeSpotify:
+    """
+    Serves current_user_saved_tracks pages from a list of saved track items,
+    and playlist_items pages from `playlists`, a dict of playlist ID to items.
+    """
+
+    def __init__(self, items, latency=0.0, playlists=None):
+        self.items = items
+        self.latency = latency
+        self.playlists = playlists or {}
+        self.requests = 0
+
+    def _page(self, items, limit, offset, url):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        total = len(items)
+        next_url = f"{url}?offset={offset + limit}" if offset + limit < total else None
+        return {
+            'items': items[offset:offset + limit],
+            'limit': limit,
+            'offset': offset,
+            'total': total,
+            'next': next_url,
+        }
+
+    def current_user_saved_tracks(self, limit=20, offset=0, market=None):
+        return self._page(self.items, limit, offset, "fake://me/tracks")
+
+    def playlist_items(self, playlist_id, fields=None, limit=100, offset=0, market=None, additional_types=("track", "episode")):
+        return self._page(self.playlists[playlist_id], limit, offset, f"fake://playlists/{playlist_id}/tracks")
@@ -0,0 +1,265 @@
+# benchmarks/fixtures.py
+
+"""
+Writers for small synthetic, tagged audio files used by the benchmarks.
+The audio payload is random bytes: the files are only valid as far as the
+tag headers are concerned, which is all the tag readers look at.
+"""
+
+import os
+import random
+import struct
+from mutagen.easyid3 import EasyID3
+from mutagen.id3 import ID3NoHeaderError
+from mutagen.ogg import OggPage
+from mutagen._vorbis import VComment
+
+AUDIO_PAYLOAD_BYTES = 256 * 1024
+
+
+def _payload(size):
+    return os.urandom(size)
+
+
+def write_mp3(path, artist, title, payload_bytes=AUDIO_PAYLOAD_BYTES):
+    with open(path, 'wb') as f:
+        f.write(_payload(payload_bytes))
+    try:
+        tags = EasyID3(path)
+    except ID3NoHeaderError:
+        tags = EasyID3()
+    tags['artist'] = artist
+    tags['title'] = title
+    tags.save(path)
+
+
+def _vorbis_comment(artist, title, framing):
+    comment = VComment()
+    comment.append(('ARTIST', artist))
+    comment.append(('TITLE', title))
+    return comment.write(framing=framing)
+
+
+def write_flac(path, artist, title, payload_bytes=AUDIO_PAYLOAD_BYTES):
+    # STREAMINFO: 44.1kHz, 2 channels, 16 bits per sample
+    streaminfo = struct.pack('>HH', 4096, 4096) + b'\x00' * 6
+    streaminfo += ((44100 << 44) | (1 << 41) | (15 << 36)).to_bytes(8, 'big') + b'\x00' * 16
+    comment = _vorbis_comment(artist, title, framing=False)
+    with open(path, 'wb') as f:
+        f.write(b'fLaC')
+        f.write(bytes([0]) + len(streaminfo).to_bytes(3, 'big') + streaminfo)
+        f.write(bytes([0x80 | 4]) + len(comment).to_bytes(3, 'big') + comment)
+        f.write(b'\xff\xf8' + _payload(payload_bytes))
+
+
+def _atom(name, data):
+    return struct.pack('>I', len(data) + 8) + name + data
+
+
+def write_m4a(path, artist, title, payload_bytes=AUDIO_PAYLOAD_BYTES):
+    def text_item(name, value):
+        return _atom(name, _atom(b'data', struct.pack('>II', 1, 0) + value.encode('utf-8')))
+
+    ilst = _atom(b'ilst', text_item(b'\xa9ART', artist) + text_item(b'\xa9nam', title))
+    hdlr = _atom(b'hdlr', b'\x00' * 8 + b'mdirappl' + b'\x00' * 9)
+    meta = _atom(b'meta', b'\x00' * 4 + hdlr + ilst)
+    moov = _atom(b'moov', _atom(b'udta', meta))
+    with open(path, 'wb') as f:
+        f.write(_atom(b'ftyp', b'M4A \x00\x00\x00\x00M4A mp42isom'))
+        f.write(moov)
+        f.write(_atom(b'mdat', _payload(payload_bytes)))
+
+
+def write_ogg(path, artist, title, payload_bytes=AUDIO_PAYLOAD_BYTES):
+    identification = b'\x01vorbis' + struct.pack('<IBIiii', 0, 2, 44100, 0, 128000, 0) + b'\xb8\x01'
+    comment = b'\x03vorbis' + _vorbis_comment(artist, title, framing=True)
+    pages = []
+    first = OggPage()
+    first.packets = [identification]
+    first.first = True
+    pages.append(first)
+    second = OggPage()
+    second.packets = [comment]
+    second.sequence = 1
+    pages.append(second)
+    audio = _payload(payload_bytes)
+    chunk = 4096
+    for sequence, start in enumerate(range(0, len(audio), chunk), start=2):
+        page = OggPage()
+        page.packets = [audio[start:start + chunk]]
+        page.sequence = sequence
+        page.position = sequence * chunk
+        pages.append(page)
+    pages[-1].last = True
+    with open(path, 'wb') as f:
+        for page in pages:
+            f.write(page.write())
+
+
+def write_wav(path, artist, title, payload_bytes=AUDIO_PAYLOAD_BYTES):
+    def info_item(name, value):
+        data = value.encode('utf-8') + b'\x00'
+        if len(data) & 1:
+            data += b'\x00'
+        return name + struct.pack('<I', len(data)) + data
+
+    fmt = _atom_le(b'fmt ', struct.pack('<HHIIHH', 1, 2, 44100, 44100 * 4, 4, 16))
+    data = _atom_le(b'data', _payload(payload_bytes))
+    info = _atom_le(b'LIST', b'INFO' + info_item(b'IART', artist) + info_item(b'INAM', title))
+    body = b'WAVE' + fmt + data + info
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', len(body)) + body)
+
+
+def _atom_le(name, data):
+    return name + struct.pack('<I', len(data)) + data + (b'\x00' if len(data) & 1 else b'')
+
+
+WRITERS = {
+    '.mp3': write_mp3,
+    '.flac': write_flac,
+    '.m4a': write_m4a,
+    '.ogg': write_ogg,
+    '.wav': write_wav,
+}
+
+
+def write_audio_file(path, artist, title, payload_bytes=AUDIO_PAYLOAD_BYTES):
+    """Writes a synthetic tagged file, picking the format from the extension of `path`."""
+    WRITERS[os.path.splitext(path)[1].lower()](path, artist, title, payload_bytes)
+
+
+WORDS = (
+    "amber anchor april atlas autumn avenue bamboo beacon bitter black blue bloom bright broken "
+    "canyon carbon cedar chrome cinder circle cobalt coral cosmic crimson crystal dancing daylight "
+    "desert diamond distant dream drift dusk echo eclipse ember empire evening falcon feather fever "
+    "fire flame forest frozen garden ghost glass golden gravity harbor harvest haze heart hollow "
+    "honey horizon island ivory jade jungle kingdom lantern laser lemon liquid lotus lunar magnet "
+    "marble meadow mercury midnight mirror monsoon moon morning neon night noble north ocean olive "
+    "orbit paper phantom pilot planet polar prism purple quiet radio rain raven rebel river rocket "
+    "rose ruby saffron satellite scarlet shadow signal silent silver sky smoke solar spiral static "
+    "stone storm summer sunset thunder tide tiger velvet violet voltage wave whisper wild willow "
+    "winter wolf yellow zenith"
+).split()
+
+
+def _unique_names(rng, count, min_words, max_words, taken=None):
+    taken = set() if taken is None else taken
+    names = []
+    while len(names) < count:
+        name = " ".join(rng.sample(WORDS, rng.randint(min_words, max_words))).title()
+        if name not in taken:
+            taken.add(name)
+            names.append(name)
+    return names
+
+
+def build_library(root, artists, tracks_per_artist, formats=tuple(WRITERS), payload_bytes=1024, seed=0):
+    """
+    Writes a synthetic library laid out as root/Artist/Album/NN Title.ext and
+    returns the list of (artist, title) pairs that were written.
+    """
+    rng = random.Random(seed)
+    songs = []
+    for artist in _unique_names(rng, artists, 2, 3):
+        album_dir = os.path.join(root, artist, "Album")
+        os.makedirs(album_dir, exist_ok=True)
+        for number, title in enumerate(_unique_names(rng, tracks_per_artist, 2, 4), start=1):
+            ext = formats[(number - 1) % len(formats)]
+            write_audio_file(os.path.join(album_dir, f"{number:02d} {title}{ext}"), artist, title, payload_bytes)
+            songs.append((artist, title))
+    return songs
+
+
+def build_sheet_values(songs, headers=("Date Added", "Title", "Artist", "Album", "Spotify Link", "Acquirement Status", "Triaged")):
+    """Returns get_all_values()-style rows: three preamble rows, headers on row 4, then one row per song."""
+    values = [[], [], [], list(headers)]
+    for artist, title in songs:
+        row_map = {"Title": title, "Artist": artist}
+        values.append([row_map.get(header, "") for header in headers])
+    return values
+
+
+ACCENTS = {'a': 'á', 'e': 'é', 'i': 'í', 'o': 'ö', 'u': 'ü', 'n': 'ñ'}
+TITLE_SUFFIXES = (" (Remastered 2011)", " - Radio Edit", " (Live)", " [Explicit]", " (feat. {guest})", " feat. {guest}")
+
+
+def _typo(rng, text):
+    """Swaps two adjacent letters of one word."""
+    positions = [i for i in range(len(text) - 1) if text[i].isalpha() and text[i + 1].isalpha()]
+    if not positions:
+        return text
+    i = rng.choice(positions)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def _accent(rng, text):
+    positions = [i for i, char in enumerate(text) if char.lower() in ACCENTS]
+    if not positions:
+        return text
+    i = rng.choice(positions)
+    return text[:i] + ACCENTS[text[i].lower()] + text[i + 1:]
+
+
+def noisy_title(rng, title, guests):
+    """Returns `title` as it might appear in a file's tags: recased, suffixed, accented or misspelled."""
+    kind = rng.random()
+    if kind < 0.35:
+        return title
+    if kind < 0.50:
+        return title.lower()
+    if kind < 0.75:
+        return title + rng.choice(TITLE_SUFFIXES).format(guest=rng.choice(guests))
+    if kind < 0.90:
+        return _accent(rng, title)
+    return _typo(rng, title)
+
+
+def noisy_artist(rng, artist):
+    """Returns `artist` as it might appear in tags or folder names."""
+    kind = rng.random()
+    if kind < 0.60:
+        return artist
+    if kind < 0.75:
+        return artist.upper() if rng.random() < 0.5 else artist.lower()
+    if kind < 0.90:
+        return "The " + artist
+    return _accent(rng, artist)
+
+
+def build_noisy_library(root, artists, tracks_per_artist, formats=tuple(WRITERS), payload_bytes=1024,
+                        seed=0, untagged_fraction=0.1, extra_fraction=0.1, compilation_fraction=0.05):
+    """
+    Writes a synthetic library whose tags and folder names differ from the
+    clean names the way real libraries do (see noisy_title/noisy_artist).
+    Some files carry no tags and are only named "Artist - Title.ext", tagged
+    files are sometimes filed under "Various Artists/Compilation" instead of
+    their artist's folder, and `extra_fraction` more files per artist are not
+    in the returned song list.
+    Returns the clean (artist, title) pairs of the files expected to match.
+    """
+    rng = random.Random(seed)
+    artist_names = _unique_names(rng, artists, 2, 3)
+    taken = set(artist_names)
+    songs = []
+    compilation_dir = os.path.join(root, "Various Artists", "Compilation")
+    os.makedirs(compilation_dir, exist_ok=True)
+    for artist in artist_names:
+        album_dir = os.path.join(root, noisy_artist(rng, artist), "Album")
+        os.makedirs(album_dir, exist_ok=True)
+        extras = int(tracks_per_artist * extra_fraction)
+        titles = _unique_names(rng, tracks_per_artist + extras, 2, 4, taken)
+        for number, title in enumerate(titles, start=1):
+            ext = formats[(number - 1) % len(formats)]
+            file_artist = noisy_artist(rng, artist)
+            file_title = noisy_title(rng, title, artist_names)
+            if rng.random() < untagged_fraction:
+                # No tags at all; the scanner falls back to the file name
+                with open(os.path.join(album_dir, f"{file_artist} - {file_title}{ext}"), 'wb') as f:
+                    f.write(_payload(payload_bytes))
+            else:
+                folder = compilation_dir if rng.random() < compilation_fraction else album_dir
+                write_audio_file(os.path.join(folder, f"{number:02d} {file_title}{ext}"), file_artist, file_title, payload_bytes)
+            if number <= tracks_per_artist:
+                songs.append((artist, title))
+    return songs
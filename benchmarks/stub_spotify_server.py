@@ -0,0 +1,115 @@
+# benchmarks/stub_spotify_server.py
+
+"""
+A local HTTP server that serves paginated saved-tracks JSON the way
+https://api.spotify.com/v1/me/tracks does. Point a spotipy client at it with:
+
+    sp = spotipy.Spotify(auth="stub-token")
+    sp.prefix = server.url + "/v1/"
+"""
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def make_saved_tracks(total):
+    """Saved track items, newest first, with strictly decreasing added_at timestamps."""
+    items = []
+    for i in range(total):
+        number = total - i
+        items.append({
+            "added_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(1_600_000_000 + number * 60)),
+            "track": {
+                "name": f"Track {number}",
+                "uri": f"spotify:track:{number:022d}",
+                "artists": [{"name": f"Artist {number % 97}"}],
+                "album": {"name": f"Album {number % 13}"},
+            },
+        })
+    return items
+
+
+class StubSpotifyServer:
+    """
+    Serves GET /v1/me/tracks?limit=&offset= from an in-memory list of items.
+    `latency` adds a delay per request; every `rate_limit_every`-th request is
+    answered with 429 and a Retry-After of `retry_after` seconds.
+    """
+
+    def __init__(self, total=1000, latency=0.0, rate_limit_every=0, retry_after=1):
+        self.items = make_saved_tracks(total)
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = None
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return False
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body, headers=()):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != "/v1/me/tracks":
+                    self._send_json(404, {"error": {"status": 404, "message": "Not found"}})
+                    return
+                with server.lock:
+                    server.requests += 1
+                    limited = server.rate_limit_every and server.requests % server.rate_limit_every == 0
+                    if limited:
+                        server.rate_limited += 1
+                if limited:
+                    self._send_json(429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                                    [("Retry-After", str(server.retry_after))])
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+
+                query = parse_qs(url.query)
+                limit = min(int(query.get("limit", ["20"])[0]), 50)
+                offset = int(query.get("offset", ["0"])[0])
+                total = len(server.items)
+                next_url = None
+                if offset + limit < total:
+                    next_url = f"{server.url}/v1/me/tracks?offset={offset + limit}&limit={limit}"
+                self._send_json(200, {
+                    "href": f"{server.url}{self.path}",
+                    "items": server.items[offset:offset + limit],
+                    "limit": limit,
+                    "offset": offset,
+                    "total": total,
+                    "next": next_url,
+                    "previous": None,
+                })
+
+        return Handler
@@ -1,15 +1,25 @@
 # excel.py
 
-import openpyxl
-from openpyxl import load_workbook
 import os
+from src.profiling import timed, profiled
 
 EXCEL_FILE_NAME = "song-list.xlsx"
 
+def _row_key(song_title, artist):
+    """Normalized (title, artist) key used to look up rows."""
+    return (str(song_title or '').strip().casefold(), str(artist or '').strip().casefold())
+
 def get_google_sheet_data(sheet):
     """Fetches all data from a Google Sheet worksheet."""
     return sheet.get_all_records()
 
+def _padded(row, width):
+    """Yields the row's values followed by empty strings up to `width`, without copying the row."""
+    yield from row
+    for _ in range(width - len(row)):
+        yield ''
+
+@profiled("excel.reset")
 def reset_excel_from_google_sheet(sheet):
     """
     Overwrites the local Excel file with data from the Google Sheet.
@@ -27,20 +37,21 @@ def reset_excel_from_google_sheet(sheet):
         headers = all_values[3]  # Headers on row 4
         data_rows = all_values[4:]  # Data starts on row 5
 
-        # Create a new workbook
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Music Saved Tracks"
+        # openpyxl is slow to import, so it is only loaded once a workbook is needed
+        import openpyxl
+
+        # Create a write-only workbook, which streams rows to disk instead of keeping cells in memory
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Music Saved Tracks")
 
         # Write headers
         ws.append(headers)
 
         # Write data rows
+        width = len(headers)
         for row in data_rows:
             # Pad row if it's shorter than the header length
-            if len(row) < len(headers):
-                row.extend([''] * (len(headers) - len(row)))
-            ws.append(row)
+            ws.append(_padded(row, width) if len(row) < width else row)
 
         # Save the workbook
         wb.save(EXCEL_FILE_NAME)
@@ -52,21 +63,130 @@ def reset_excel_from_google_sheet(sheet):
         print(f"An error occurred during Excel reset: {e}")
 
 
+class ExcelSession:
+    """
+    Opens the local Excel file once, applies appends and updates in memory,
+    and saves exactly once when the session is closed.
+    Use as a context manager: `with ExcelSession() as excel: ...`
+    """
+
+    def __init__(self, file_name=EXCEL_FILE_NAME):
+        self.file_name = file_name
+        self.wb = None
+        self.ws = None
+        self.headers = []
+        self.row_index = None  # (title, artist) key -> list of row numbers
+        self.dirty = False
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def open(self):
+        if not os.path.exists(self.file_name):
+            print(f"{self.file_name} not found. Please use --reset-excel first to create it.")
+            return
+        try:
+            from openpyxl import load_workbook
+            with timed("excel.load"):
+                self.wb = load_workbook(self.file_name)
+            self.ws = self.wb.active
+            self.headers = [cell.value for cell in self.ws[1]]
+        except Exception as e:
+            print(f"An error occurred while opening {self.file_name}: {e}")
+            self.wb = None
+            self.ws = None
+
+    def append_row(self, row_data):
+        """Appends a single row. Returns True if the row was appended."""
+        if self.ws is None:
+            return False
+        self.ws.append(row_data)
+        if self.row_index is not None:
+            self._index_row(self.ws.max_row, row_data)
+        self.dirty = True
+        return True
+
+    def _index_row(self, row_number, values):
+        try:
+            title_col = self.headers.index("Title")
+            artist_col = self.headers.index("Artist")
+        except ValueError:
+            return
+        values = list(values)
+        title = values[title_col] if len(values) > title_col else None
+        artist = values[artist_col] if len(values) > artist_col else None
+        self.row_index.setdefault(_row_key(title, artist), []).append(row_number)
+
+    @profiled("excel.build_index")
+    def _build_row_index(self):
+        """Builds the (title, artist) -> row numbers index with a single pass over the sheet."""
+        self.row_index = {}
+        for row_number, values in enumerate(self.ws.iter_rows(min_row=2, values_only=True), start=2):
+            self._index_row(row_number, values)
+
+    def update_row(self, song_title, artist, updates):
+        """
+        Updates specific cells for a row identified by song title and artist.
+        `updates` should be a dictionary like {'Acquirement Status': 'acquired', 'Triaged': 'triaged'}.
+        Returns True if the row was found and updated.
+        """
+        if self.ws is None:
+            return False
+
+        # Find header indices
+        try:
+            self.headers.index("Title")
+            self.headers.index("Artist")
+            update_indices = {header: self.headers.index(header) + 1 for header in updates.keys()}
+        except ValueError as e:
+            print(f"Error: A required column is missing in the Excel file - {e}")
+            return False
+
+        # Find the row to update
+        if self.row_index is None:
+            self._build_row_index()
+        row_numbers = self.row_index.get(_row_key(song_title, artist), [])
+
+        if not row_numbers:
+            print(f"Could not find row for '{song_title}' in {self.file_name} to update.")
+            return False
+        if len(row_numbers) > 1:
+            print(f"Duplicate rows {row_numbers} found for '{song_title}' by '{artist}' in {self.file_name}. Skipping update.")
+            return False
+
+        for header, col_index in update_indices.items():
+            self.ws.cell(row=row_numbers[0], column=col_index).value = updates[header]
+        self.dirty = True
+        return True
+
+    def close(self):
+        """Saves the workbook once if anything changed."""
+        if self.wb is not None and self.dirty:
+            try:
+                with timed("excel.save"):
+                    self.wb.save(self.file_name)
+                print(f"Saved changes to {self.file_name}.")
+            except Exception as e:
+                print(f"An error occurred while saving {self.file_name}: {e}")
+        self.wb = None
+        self.ws = None
+        self.dirty = False
+
+
 def append_row_to_excel(row_data):
     """
     Appends a single row to the local Excel file.
-    If the file doesn't exist, it creates it with headers.
+    Opens and saves the workbook for this one row; use ExcelSession for multiple rows.
     """
     try:
-        if not os.path.exists(EXCEL_FILE_NAME):
-            print(f"{EXCEL_FILE_NAME} not found. Please use --reset-excel first to create it.")
-            return
-
-        wb = load_workbook(EXCEL_FILE_NAME)
-        ws = wb.active
-        ws.append(row_data)
-        wb.save(EXCEL_FILE_NAME)
-        print(f"Appended new row to {EXCEL_FILE_NAME}")
+        with ExcelSession() as excel:
+            if excel.append_row(row_data):
+                print(f"Appended new row to {EXCEL_FILE_NAME}")
 
     except Exception as e:
         print(f"An error occurred while appending a row to Excel: {e}")
@@ -75,39 +195,114 @@ def update_excel_row(song_title, artist, updates):
     """
     Updates specific cells for a row identified by song title and artist.
     `updates` should be a dictionary like {'Acquirement Status': 'acquired', 'Triaged': 'triaged'}.
+    Opens and saves the workbook for this one row; use ExcelSession for multiple rows.
     """
     try:
-        if not os.path.exists(EXCEL_FILE_NAME):
-            print(f"{EXCEL_FILE_NAME} not found. Cannot update.")
+        with ExcelSession() as excel:
+            if excel.update_row(song_title, artist, updates):
+                print(f"Updated row for '{song_title}' in {EXCEL_FILE_NAME}.")
+
+    except Exception as e:
+        print(f"An error occurred while updating a row in Excel: {e}")
+
+
+def _sync_key(values, title_col, artist_col, link_col):
+    """Row key used by the sync: the Spotify link when there is one, otherwise (title, artist)."""
+    def cell(col):
+        return values[col] if col is not None and col < len(values) else None
+    link = str(cell(link_col) or '').strip()
+    if link:
+        return ('link', link)
+    return ('song',) + _row_key(cell(title_col), cell(artist_col))
+
+def _cell_text(value):
+    return '' if value is None else str(value)
+
+@profiled("excel.sync")
+def sync_excel_from_google_sheet(sheet):
+    """
+    Brings the local Excel file in line with the Google Sheet by applying only
+    the differences: rows missing locally are appended, changed cells are
+    rewritten in place, and rows no longer in the sheet are deleted.
+    Rows are matched on Spotify Link, or Title and Artist when there is no link.
+    Formatting of untouched cells is kept.
+    """
+    print(f"Syncing {EXCEL_FILE_NAME} with Google Sheet...")
+
+    all_values = sheet.get_all_values()
+    if len(all_values) < 4:
+        print("Google Sheet has fewer than 4 rows. Cannot determine headers.")
+        return
+
+    headers = list(all_values[3])  # Headers on row 4
+    # gspread pads the header row when a data row is wider; the workbook's trailing blanks are dropped too
+    while headers and not headers[-1]:
+        headers.pop()
+    data_rows = all_values[4:]  # Data starts on row 5
+
+    with ExcelSession() as excel:
+        if excel.ws is None:
             return
+        ws = excel.ws
 
-        wb = load_workbook(EXCEL_FILE_NAME)
-        ws = wb.active
+        excel_headers = [_cell_text(value) for value in excel.headers]
+        while excel_headers and not excel_headers[-1]:
+            excel_headers.pop()
+        if excel_headers != list(headers):
+            print("The Excel headers differ from the Google Sheet headers. Use --reset-excel to recreate the file.")
+            return
 
-        # Find header indices
-        headers = [cell.value for cell in ws[1]]
         try:
-            title_col_index = headers.index("Title") + 1
-            artist_col_index = headers.index("Artist") + 1
-            update_indices = {header: headers.index(header) + 1 for header in updates.keys()}
+            title_col = headers.index("Title")
+            artist_col = headers.index("Artist")
         except ValueError as e:
-            print(f"Error: A required column is missing in the Excel file - {e}")
+            print(f"Error: A required column is missing in the Google Sheet - {e}")
             return
+        link_col = headers.index("Spotify Link") if "Spotify Link" in headers else None
+        width = len(headers)
 
-        # Find the row to update
-        row_to_update = None
-        for row in ws.iter_rows(min_row=2): # Skip header row
-            if row[title_col_index - 1].value == song_title and row[artist_col_index - 1].value == artist:
-                row_to_update = row
-                break
-        
-        if row_to_update:
-            for header, col_index in update_indices.items():
-                row_to_update[col_index - 1].value = updates[header]
-            wb.save(EXCEL_FILE_NAME)
-            print(f"Updated row for '{song_title}' in {EXCEL_FILE_NAME}.")
-        else:
-            print(f"Could not find row for '{song_title}' in {EXCEL_FILE_NAME} to update.")
+        # Row numbers of each key in the workbook, in order, so duplicates pair up in order
+        excel_rows = {}
+        for row_number, values in enumerate(ws.iter_rows(min_row=2, max_col=width, values_only=True), start=2):
+            if not any(value not in (None, '') for value in values):
+                continue
+            excel_rows.setdefault(_sync_key(values, title_col, artist_col, link_col), []).append((row_number, values))
 
-    except Exception as e:
-        print(f"An error occurred while updating a row in Excel: {e}")
+        inserted = []
+        changed = 0
+        for row in data_rows:
+            # Blank rows are skipped on both sides, so they never pair up or count as inserted
+            if not any(value not in (None, '') for value in row[:width]):
+                continue
+            key = _sync_key(row, title_col, artist_col, link_col)
+            matches = excel_rows.get(key)
+            if not matches:
+                inserted.append(row)
+                continue
+            row_number, excel_values = matches.pop(0)
+            row_changed = False
+            for col in range(width):
+                new_value = row[col] if col < len(row) else ''
+                if _cell_text(excel_values[col] if col < len(excel_values) else None) != new_value:
+                    ws.cell(row=row_number, column=col + 1).value = new_value
+                    row_changed = True
+            changed += row_changed
+
+        # Delete bottom-up in contiguous blocks so earlier row numbers stay valid
+        deleted_rows = sorted((row_number for matches in excel_rows.values() for row_number, _ in matches), reverse=True)
+        index = 0
+        while index < len(deleted_rows):
+            end = deleted_rows[index]
+            start = end
+            index += 1
+            while index < len(deleted_rows) and deleted_rows[index] == start - 1:
+                start -= 1
+                index += 1
+            ws.delete_rows(start, end - start + 1)
+
+        for row in inserted:
+            ws.append(list(row) + [''] * (width - len(row)))
+
+        if inserted or changed or deleted_rows:
+            excel.dirty = True
+        print(f"Sync summary: {len(inserted)} inserted, {changed} changed, {len(deleted_rows)} deleted.")
@@ -6,19 +6,27 @@ Its capabilities, controlled by command-line flags, include:
 - Backing up recently liked Spotify songs to a Google Sheet and a local Excel file.
 - Scanning a local music directory to cross-reference with the Google Sheet and mark songs as "acquired" and "triaged".
 - Performing a full reset of the local Excel file to match the Google Sheet exactly.
+- Running the backup jobs listed in config.json, each copying liked songs or a playlist into its own worksheet.
 """
 
 import os
 import sys
 import argparse
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import json
+from src import profiling, normalize
 from src.song import parseSpotifySongUrl, getCurrentDatetime
-from excel import append_row_to_excel, reset_excel_from_google_sheet, update_excel_row
-from src.local_scanner import scan_music_library
+from src.local_store import open_local_store, LOCAL_STORES, DEFAULT_LOCAL_STORE, NO_LOCAL_STORE
+# Only defaults are imported here; each action loads its own libraries (spotipy, gspread, openpyxl, ...) when it runs
+from src.local_scanner import DEFAULT_WORKERS, SCAN_STRATEGIES, DEFAULT_SCAN_STRATEGY
+from src.fingerprint import FINGERPRINT_SECONDS
+from src.library_watcher import POLL_INTERVAL_SECONDS
+from src.sheet_writer import SheetWriteBuffer, DEFAULT_BATCH_SIZE
+from src.spotify_pages import fetch_all_saved_tracks, fetch_saved_tracks_since, DEFAULT_FETCH_WORKERS
+
+# Remembers the newest backed up Spotify track between runs
+BACKUP_STATE_FILE = ".backup_state.json"
+# Local copy of the sheet values, reused while the spreadsheet is unmodified
+SHEET_SNAPSHOT_FILE = ".sheet_snapshot.json"
 
 # Define a function to parse command line arguments
 def parse_cli_args():
@@ -35,17 +43,38 @@ def parse_cli_args():
 
     # Operational Flags
     parser.add_argument("--backup-tracks", action="store_true", help="Run the Spotify backup process.")
+    parser.add_argument("--backup-jobs", nargs="*", metavar="NAME", help="Run the backup jobs listed under \"jobs\" in config.json concurrently (all of them, or only the named ones).")
     parser.add_argument("--scan-local", action="store_true", help="Scan local music files.")
     parser.add_argument("--reset-excel", action="store_true", help="Reset the local Excel file from the Google Sheet.")
+    parser.add_argument("--watch", action="store_true", help="Keep running and mark new files in --scan-path as acquired as soon as they appear.")
+    parser.add_argument("--sync-excel", action="store_true", help="Apply only the rows that changed in the Google Sheet to the local Excel file.")
 
     # Options
-    parser.add_argument("--top", type=int, default=10, help="Number of recent songs to fetch from Spotify.")
+    parser.add_argument("--top", type=int, default=10, help="Maximum number of recent songs to fetch from Spotify (0 for no limit). Ignored once a backup is saved; later runs fetch every song liked since then.")
+    parser.add_argument("--full-backup", action="store_true", help="Fetch every liked song from Spotify using concurrent requests (ignores --top and the last backup).")
+    parser.add_argument("--fetch-workers", type=int, default=DEFAULT_FETCH_WORKERS, help="Number of concurrent Spotify requests for --full-backup.")
+    parser.add_argument("--no-incremental", action="store_true", help="Ignore the last backed up track and re-fetch the most recent songs.")
     parser.add_argument("--scan-path", help="Path to local music library for scanning.")
     parser.add_argument("--mode", choices=['scan', 'update'], default='scan', help="Mode for scanning local files ('scan' for dry-run, 'update' to apply changes).")
+    parser.add_argument("--scan-strategy", choices=SCAN_STRATEGIES, default=DEFAULT_SCAN_STRATEGY, help="'artists' only walks folders named like a pending artist; 'library' indexes every file in the library once, which also finds songs in compilation or misnamed folders.")
+    parser.add_argument("--fingerprint", action="store_true", help="Identify untagged files by acoustic fingerprint against files already matched to a song (requires Chromaprint's fpcalc on the PATH). Identified files are copies of songs you have, so they are kept out of file name matching; only pending rows that repeat such a song are matched by fingerprint.")
+    parser.add_argument("--fingerprint-seconds", type=int, default=FINGERPRINT_SECONDS, help="Seconds of audio decoded per fingerprint.")
+    parser.add_argument("--poll-interval", type=int, default=POLL_INTERVAL_SECONDS, help="Seconds between library checks for --watch when inotify is not available.")
+    parser.add_argument("--rebuild-cache", action="store_true", help="Discard the local metadata cache and re-read tags from every scanned file.")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted --scan-local from .scan_checkpoint.json, sending only the updates not yet applied.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of threads reading tags from local files during a scan.")
+    parser.add_argument("--refresh-sheet", action="store_true", help="Download the Google Sheet even if the local snapshot is up to date.")
+    parser.add_argument("--local-store", choices=LOCAL_STORES, help=f"Local copy of the sheet to update (default '{DEFAULT_LOCAL_STORE}'). With 'sqlite', song-list.xlsx becomes an export.")
+    parser.add_argument("--export-excel", action="store_true", help="Export the SQLite local store to song-list.xlsx.")
+    parser.add_argument("--export-parquet", action="store_true", help="Export the SQLite local store to song-list.parquet (requires pyarrow).")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Maximum number of rows or cells sent to Google Sheets per request.")
+    parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown (calls, total, p50/p95) at the end of the run.")
+    parser.add_argument("--profile-json", help="Append the timing breakdown as a JSON line to this file (implies --profile).")
 
     args = parser.parse_args()
 
     # Load from config.json if essential args are missing
+    config = {}
     config_args = {}
     config_file = "config.json"
     if os.path.exists(config_file):
@@ -63,6 +92,11 @@ def parse_cli_args():
     
     # Convert back to a namespace for consistency
     final_args = argparse.Namespace(**config_args)
+    # Applied after merging so local_store can also come from config.json
+    if not getattr(final_args, 'local_store', None):
+        final_args.local_store = DEFAULT_LOCAL_STORE
+    # Backup jobs are objects, so they have their own "jobs" list instead of "args" entries
+    final_args.jobs_config = config.get("jobs", [])
 
     return final_args
 
@@ -76,6 +110,9 @@ def validate_args(args):
 
 
 def authenticate_spotify(args):
+    import spotipy
+    from spotipy.oauth2 import SpotifyOAuth
+
     # Assign command line arguments to variables
     scope = "user-library-read"
     
@@ -91,41 +128,229 @@ def authenticate_spotify(args):
     return sp
 
 
-def get_spotify_songs(sp, top=10):
+def load_backup_state():
+    if os.path.exists(BACKUP_STATE_FILE):
+        try:
+            with open(BACKUP_STATE_FILE, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Could not read {BACKUP_STATE_FILE}, starting a full fetch: {e}")
+    return {}
+
+
+def save_backup_state(state):
+    with open(BACKUP_STATE_FILE, "w") as file:
+        json.dump(state, file, indent=4)
+
+
+@profiling.profiled("spotify.get_songs")
+def get_spotify_songs(sp, top=10, since=None):
+    """
+    Fetches liked songs, newest first, one page at a time.
+    Paging stops after `top` songs (0 for no limit) or at the first song added
+    at or before `since`, an ISO 8601 `added_at` timestamp from a previous backup.
+    `top` is ignored when `since` is given, so no song liked since then is skipped.
+    Returns the songs oldest first.
+    """
     import spotipy
     import requests
 
-    results = None
+    if since:
+        # The saved mark moves to the newest song, so songs left out here would never be fetched
+        top = 0
+    songs = []
     try:
-        results = sp.current_user_saved_tracks(limit=top)
+        songs = fetch_saved_tracks_since(sp, since, top)
     except (spotipy.oauth2.SpotifyOauthError, requests.exceptions.HTTPError) as e:
-        print(
-            "Spotify authentication error detected (likely due to revoked/expired token).\nAttempting to remove .cache and prompting for re-authentication..."
-        )
-        cache_path = ".cache"
-        import os
-
-        if os.path.exists(cache_path):
-            os.remove(cache_path)
-            print(
-                "Removed .cache file. Please re-run the script to re-authenticate with Spotify."
-            )
-        else:
-            print(
-                "No .cache file found to remove. Please check your credentials and re-authenticate."
-            )
-        sys.exit(1)
-    songs = []
-    for idx, item in enumerate(results["items"]):
+        handle_spotify_auth_error()
+    for number, item in enumerate(songs):
         track = item["track"]
-        print(idx, track["artists"][0]["name"], " – ", track["name"])
-        songs.append(item)
+        print(number, track["artists"][0]["name"], " – ", track["name"])
+
+    songs.reverse()
+    return songs
+
+
+@profiling.profiled("spotify.get_all_songs")
+def get_all_spotify_songs(sp, workers=DEFAULT_FETCH_WORKERS):
+    """Fetches every liked song with concurrent page requests. Returns the songs oldest first."""
+    import spotipy
+    import requests
+
+    try:
+        songs = fetch_all_saved_tracks(sp, workers)
+    except (spotipy.oauth2.SpotifyOauthError, requests.exceptions.HTTPError) as e:
+        handle_spotify_auth_error()
 
     songs.reverse()
     return songs
 
 
+def handle_spotify_auth_error():
+    print(
+        "Spotify authentication error detected (likely due to revoked/expired token).\nAttempting to remove .cache and prompting for re-authentication..."
+    )
+    cache_path = ".cache"
+
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+        print(
+            "Removed .cache file. Please re-run the script to re-authenticate with Spotify."
+        )
+    else:
+        print(
+            "No .cache file found to remove. Please check your credentials and re-authenticate."
+        )
+    sys.exit(1)
+
+
+class SheetSnapshot:
+    """
+    Wraps a worksheet so the sheet is downloaded at most once per run.
+    get_all_values() is answered from memory, and writes made through
+    append_rows/batch_update/update_cell are forwarded to the worksheet and
+    applied to the in-memory copy. The values can be saved to disk together
+    with the spreadsheet's modified time, so an unchanged sheet is not
+    downloaded again on the next run. Each write checks that nobody else
+    modified the sheet since it was read; if someone did, the values are
+    stale and are not saved.
+    """
+
+    def __init__(self, sheet, values, modified_time=None):
+        self.sheet = sheet
+        self.values = values
+        self.modified_time = modified_time
+        self.stale = False
+
+    def __getattr__(self, name):
+        # Everything not overridden here goes straight to the worksheet
+        return getattr(self.sheet, name)
+
+    @classmethod
+    def load(cls, sheet, use_disk=True):
+        modified_time = cls._fetch_modified_time(sheet)
+        if use_disk and modified_time and os.path.exists(SHEET_SNAPSHOT_FILE):
+            try:
+                with open(SHEET_SNAPSHOT_FILE, "r") as file:
+                    saved = json.load(file)
+                if saved.get("sheet") == cls._sheet_key(sheet) and saved.get("modified_time") == modified_time:
+                    print("Google Sheet unchanged since the last run. Using the local snapshot.")
+                    return cls(sheet, saved["values"], modified_time)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Could not read {SHEET_SNAPSHOT_FILE}: {e}")
+        print("Downloading Google Sheet...")
+        with profiling.timed("sheet.get_all_values"):
+            values = sheet.get_all_values()
+        return cls(sheet, values, modified_time)
+
+    @staticmethod
+    def _sheet_key(sheet):
+        # A worksheet's id is its gid, which is 0 for the first worksheet of every spreadsheet
+        return [sheet.spreadsheet.id, sheet.id]
+
+    @staticmethod
+    @profiling.profiled("sheet.modified_time")
+    def _fetch_modified_time(sheet):
+        try:
+            return sheet.spreadsheet.get_lastUpdateTime()
+        except Exception as e:
+            print(f"Could not read the Google Sheet's modified time: {e}")
+            return None
+
+    def refresh(self):
+        """Downloads the sheet again if it was modified. Returns True if the values changed."""
+        modified_time = self._fetch_modified_time(self.sheet)
+        if modified_time and modified_time == self.modified_time:
+            return False
+        with profiling.timed("sheet.get_all_values"):
+            self.values = self.sheet.get_all_values()
+        self.modified_time = modified_time
+        self.stale = False
+        return True
+
+    def _check_unchanged(self):
+        """Before a write: marks the values stale if the sheet was modified since they were read."""
+        if not self.stale and self.modified_time:
+            if self._fetch_modified_time(self.sheet) != self.modified_time:
+                self.stale = True
+
+    def _written(self):
+        """After a write: our own write changed the modified time, so read it again."""
+        if not self.stale and self.modified_time:
+            self.modified_time = self._fetch_modified_time(self.sheet)
+
+    def get_all_values(self):
+        # Copies, so callers can modify the rows they get back
+        return [list(row) for row in self.values]
+
+    def append_rows(self, values, **kwargs):
+        self._check_unchanged()
+        result = self.sheet.append_rows(values, **kwargs)
+        self._written()
+        self.values.extend(list(row) for row in values)
+        return result
+
+    def append_row(self, values, **kwargs):
+        self._check_unchanged()
+        result = self.sheet.append_row(values, **kwargs)
+        self._written()
+        self.values.append(list(values))
+        return result
+
+    def batch_update(self, data, **kwargs):
+        from gspread.utils import a1_to_rowcol
+        self._check_unchanged()
+        result = self.sheet.batch_update(data, **kwargs)
+        self._written()
+        for update in data:
+            start_row, start_col = a1_to_rowcol(update["range"].split(":")[0])
+            for row_offset, row_values in enumerate(update["values"]):
+                for col_offset, value in enumerate(row_values):
+                    self._set_cell(start_row + row_offset, start_col + col_offset, value)
+        return result
+
+    def update_cell(self, row, col, value):
+        self._check_unchanged()
+        result = self.sheet.update_cell(row, col, value)
+        self._written()
+        self._set_cell(row, col, value)
+        return result
+
+    def _set_cell(self, row, col, value):
+        while len(self.values) < row:
+            self.values.append([])
+        row_values = self.values[row - 1]
+        if len(row_values) < col:
+            row_values.extend([""] * (col - len(row_values)))
+        row_values[col - 1] = "" if value is None else str(value)
+
+    def save(self):
+        """
+        Writes the values to disk with the modified time they were read or last
+        written at. Edits made by others after that give the sheet a newer modified
+        time, so the next run downloads it again. Stale values are not saved at all.
+        """
+        if self.stale or not self.modified_time:
+            if self.stale:
+                print("The Google Sheet was edited elsewhere during this run; it will be downloaded again next time.")
+            try:
+                if os.path.exists(SHEET_SNAPSHOT_FILE):
+                    os.remove(SHEET_SNAPSHOT_FILE)
+            except OSError as e:
+                print(f"Could not remove {SHEET_SNAPSHOT_FILE}: {e}")
+            return
+        try:
+            with open(SHEET_SNAPSHOT_FILE, "w") as file:
+                json.dump({"sheet": self._sheet_key(self.sheet), "modified_time": self.modified_time, "values": self.values}, file)
+        except OSError as e:
+            print(f"Could not write {SHEET_SNAPSHOT_FILE}: {e}")
+
+
+@profiling.profiled("sheet.auth")
 def authenticate_google_sheets(credentials_file):
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
     # Use the credentials file to authenticate
     scope = [
         "https://spreadsheets.google.com/feeds",
@@ -136,7 +361,8 @@ def authenticate_google_sheets(credentials_file):
     return client
 
 
-def append_songs_to_google_sheets(songs, sheet):
+@profiling.profiled("backup.append_songs")
+def append_songs_to_google_sheets(songs, sheet, batch_size=DEFAULT_BATCH_SIZE, local_store=DEFAULT_LOCAL_STORE):
     try:
         all_values = sheet.get_all_values()
         headers = all_values[3]  # Headers on row 4
@@ -152,17 +378,20 @@ def append_songs_to_google_sheets(songs, sheet):
 
     except (ValueError, IndexError) as e:
         print(f"Error reading sheet structure: {e}")
-        return
+        return False
 
     songs_to_add = []
     for song in songs:
         song_title = song["track"]["name"]
         song_artist = song["track"]["artists"][0]["name"]
         if (song_title, song_artist) not in existing_songs:
+            # A song can be fetched twice, e.g. when it is in a playlist twice
+            existing_songs.add((song_title, song_artist))
             songs_to_add.append(song)
 
     if songs_to_add:
         print(f"Found {len(songs_to_add)} new songs to add.")
+        rows = []
         for song in songs_to_add:
             # Dynamically build the row based on headers
             row_data_map = {
@@ -173,39 +402,190 @@ def append_songs_to_google_sheets(songs, sheet):
                 "Spotify Link": parseSpotifySongUrl(song),
                 "Method Added": "Auto Added",
             }
-            
+
             # Ensure all headers are present in the final row data
-            final_row_data = [row_data_map.get(header, "") for header in headers]
-            
-            sheet.append_row(final_row_data)
-            append_row_to_excel(final_row_data)
+            rows.append([row_data_map.get(header, "") for header in headers])
+
+        # Rows are sent to the sheet in batches. The local store is only written once
+        # they are all in, so a failed request never leaves rows the sheet does not have
+        writer = SheetWriteBuffer(sheet, batch_size)
+        for row in rows:
+            writer.append_row(row)
+        writer.flush()
+        with open_local_store(local_store) as store:
+            for row in rows:
+                store.append_row(row)
     else:
         print(
             f"All {len(songs)} most recently liked songs are already in the spreadsheet."
         )
+    return True
 
 def run_spotify_backup(args, sheet):
     """Handles the logic for backing up Spotify tracks."""
     print("Running Spotify backup...")
     validate_args(args)
     sp = authenticate_spotify(args)
-    songs = get_spotify_songs(sp, int(args.top))
-    append_songs_to_google_sheets(songs, sheet)
+    state = load_backup_state()
+    if args.full_backup:
+        songs = get_all_spotify_songs(sp, int(args.fetch_workers))
+    else:
+        since = None if args.no_incremental else state.get("last_added_at")
+        if since:
+            print(f"Fetching songs liked since the last backup ({since})...")
+        songs = get_spotify_songs(sp, int(args.top), since)
+    if not songs:
+        print("No new liked songs on Spotify.")
+    elif append_songs_to_google_sheets(songs, sheet, int(args.batch_size), args.local_store):
+        newest = max(song["added_at"] for song in songs)
+        if newest > state.get("last_added_at", ""):
+            state["last_added_at"] = newest
+            save_backup_state(state)
     print("Spotify backup complete.")
 
-from src.local_scanner import scan_music_library
+def run_backup_job(job, sp, args, since=None):
+    """
+    Backs up one job's songs added after `since` into its worksheet.
+    Returns {'fetched', 'added', 'newest', 'seconds', 'error'}; errors are reported there, not raised.
+    """
+    import time
+    import spotipy
+    from src.backup_jobs import fetch_job_songs, auth_error_message
+    from src.sheet_writer import with_backoff
+
+    start = time.perf_counter()
+    result = {"fetched": 0, "added": 0, "newest": None, "error": None}
+    try:
+        songs = fetch_job_songs(sp, job, since, args.full_backup, int(args.fetch_workers))
+        result["fetched"] = len(songs)
+        print(f"[{job.name}] Fetched {len(songs)} new songs from {job.source}.")
+        if songs:
+            # One client per job, so threads do not share an HTTP session
+            client = authenticate_google_sheets(args.credentials_file)
+            spreadsheet = with_backoff(client.open, job.spreadsheet)
+            if job.worksheet:
+                worksheet = with_backoff(spreadsheet.worksheet, job.worksheet)
+            else:
+                worksheet = with_backoff(spreadsheet.get_worksheet, 0)
+            # The dedupe set is built from this one read, and appended rows are added to the copy
+            sheet = SheetSnapshot(worksheet, with_backoff(worksheet.get_all_values))
+            rows_before = len(sheet.values)
+            if not append_songs_to_google_sheets(songs, sheet, int(args.batch_size), NO_LOCAL_STORE):
+                raise ValueError(f"worksheet '{worksheet.title}' does not have the expected headers on row 4")
+            result["added"] = len(sheet.values) - rows_before
+            # Tracks in old playlists have no added_at, and say nothing about where the next run should start
+            result["newest"] = max((song["added_at"] for song in songs if song["added_at"]), default=None)
+    except spotipy.oauth2.SpotifyOauthError as e:
+        result["error"] = auth_error_message(job, e)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_backup_jobs(args, names=None):
+    """
+    Runs the backup jobs from config.json, or only those in `names`. Jobs run
+    concurrently and share the Spotify and Google Sheets rate limiters; the
+    newest backed up song of each job is saved for its next incremental run.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from src.backup_jobs import parse_backup_jobs, open_spotify, auth_error_message
+
+    try:
+        jobs = parse_backup_jobs(args.jobs_config, args, names)
+    except ValueError as e:
+        print(f"Error in the \"jobs\" list of config.json: {e}")
+        sys.exit(1)
+    if not jobs:
+        print("No backup jobs found. Add a \"jobs\" list to config.json.")
+        return
+    if not getattr(args, "credentials_file", None):
+        print("Error: credentials_file is not provided in CLI arguments or config.json.")
+        sys.exit(1)
+
+    # Authorized one at a time, so first-run browser prompts do not overlap
+    clients = {}
+    results = {}
+    for job in jobs:
+        try:
+            clients[job.name] = open_spotify(job)
+        except Exception as e:
+            results[job.name] = {"fetched": 0, "added": 0, "newest": None, "seconds": 0, "error": auth_error_message(job, e)}
+
+    state = load_backup_state()
+    job_state = state.setdefault("jobs", {})
+    runnable = [job for job in jobs if job.name in clients]
+    print(f"Running {len(runnable)} backup jobs...")
+    if runnable:
+        with ThreadPoolExecutor(max_workers=len(runnable)) as executor:
+            futures = {}
+            for job in runnable:
+                since = None if args.no_incremental or args.full_backup else job_state.get(job.name)
+                futures[job.name] = executor.submit(run_backup_job, job, clients[job.name], args, since)
+            for name, future in futures.items():
+                results[name] = future.result()
+
+    changed = False
+    for name, result in results.items():
+        if result["newest"] and not result["error"] and result["newest"] > job_state.get(name, ""):
+            job_state[name] = result["newest"]
+            changed = True
+    # Written once, after every job finished, so threads never write the file at the same time
+    if changed:
+        save_backup_state(state)
+
+    print("--- Backup jobs ---")
+    print(f"{'job':<20}{'fetched':>9}{'added':>7}{'seconds':>9}  result")
+    for job in jobs:
+        result = results[job.name]
+        print(f"{job.name:<20}{result['fetched']:>9}{result['added']:>7}{result['seconds']:>9.1f}  {result['error'] or 'ok'}")
+
+
 def run_local_scanner(args, sheet):
     """Handles the logic for scanning local music files."""
+    from src.local_scanner import scan_music_library
+
     if not args.scan_path:
         print("Error: --scan-path is required for --scan-local.")
         sys.exit(1)
-    scan_music_library(sheet, args.scan_path.strip('"'), args.mode)
+    scan_music_library(sheet, args.scan_path.strip('"'), args.mode, int(args.batch_size), args.rebuild_cache, int(args.workers),
+                       args.local_store, args.scan_strategy, args.fingerprint, int(args.fingerprint_seconds), args.resume)
+
+
+def run_library_watch(args, sheet):
+    """Handles the logic for watching the local music library for new files."""
+    from src.library_watcher import watch_music_library
+
+    if not args.scan_path:
+        print("Error: --scan-path is required for --watch.")
+        sys.exit(1)
+    watch_music_library(sheet, args.scan_path.strip('"'), args.mode, int(args.batch_size), args.local_store, int(args.poll_interval))
 
 
 def run_excel_reset(args, sheet):
-    """Handles the logic for resetting the Excel file."""
-    print("Resetting local Excel file from Google Sheet...")
-    reset_excel_from_google_sheet(sheet)
+    """Handles the logic for resetting the local store (the Excel file by default)."""
+    print(f"Resetting local {args.local_store} store from Google Sheet...")
+    with open_local_store(args.local_store) as store:
+        store.reset(sheet)
+
+
+def run_excel_sync(args, sheet):
+    """Handles the logic for syncing the local store with the Google Sheet."""
+    with open_local_store(args.local_store) as store:
+        store.sync(sheet)
+
+
+def run_local_export(args):
+    """Handles exporting the SQLite local store to Excel and/or Parquet."""
+    if args.local_store != 'sqlite':
+        print("Error: --export-excel and --export-parquet need --local-store sqlite.")
+        return
+    with open_local_store(args.local_store) as store:
+        if args.export_excel:
+            store.export_excel()
+        if args.export_parquet:
+            store.export_parquet()
 
 
 def main():
@@ -215,9 +595,26 @@ def main():
 
     args = parse_cli_args()
 
+    profile_json = getattr(args, 'profile_json', None)
+    if args.profile or profile_json:
+        profiling.enable()
+    try:
+        with profiling.timed("run.total"):
+            run_actions(args)
+    finally:
+        if profiling.is_enabled():
+            profiling.print_report()
+            normalize.print_hit_rates()
+            if profile_json:
+                profiling.write_json(profile_json, argv=sys.argv[1:], normalization=normalize.hit_rates())
+
+
+def run_actions(args):
+    """Runs every action requested on the command line."""
     # Authenticate Google Sheets once if any action requires it
     sheet = None
-    if args.backup_tracks or args.scan_local or args.reset_excel:
+    if args.backup_tracks or args.scan_local or args.reset_excel or args.sync_excel or args.watch:
+        import gspread
         validate_args(args) # a subset of args are needed for sheets
         sheets_client = authenticate_google_sheets(
             credentials_file=args.credentials_file
@@ -231,19 +628,37 @@ def main():
                 "- Make sure you have shared the sheet with your service account email (found in your credentials file)."
             )
             sys.exit(1)
-
+        # All actions below share one download of the sheet
+        sheet = SheetSnapshot.load(sheet, use_disk=not args.refresh_sheet)
 
     if args.backup_tracks:
         run_spotify_backup(args, sheet)
+
+    backup_jobs = getattr(args, 'backup_jobs', None)
+    if backup_jobs is not None:
+        run_backup_jobs(args, backup_jobs)
     
     if args.scan_local:
         run_local_scanner(args, sheet)
 
     if args.reset_excel:
         run_excel_reset(args, sheet)
+    elif args.sync_excel:
+        run_excel_sync(args, sheet)
+
+    if args.export_excel or args.export_parquet:
+        run_local_export(args)
+
+    # Runs until interrupted, so it goes after every one-off action
+    if args.watch:
+        run_library_watch(args, sheet)
+
+    if sheet is not None:
+        sheet.save()
 
-    if not any([args.backup_tracks, args.scan_local, args.reset_excel]):
-        print("No action specified. Use --backup-tracks, --scan-local, or --reset-excel.")
+    if not any([args.backup_tracks, backup_jobs is not None, args.scan_local, args.reset_excel, args.sync_excel,
+                args.export_excel, args.export_parquet, args.watch]):
+        print("No action specified. Use --backup-tracks, --backup-jobs, --scan-local, --watch, --reset-excel, --sync-excel, or --export-excel.")
         print("Use -h or --help for more information.")
 
 
@@ -0,0 +1,57 @@
+# src/artist_index.py
+
+from collections import Counter, defaultdict
+from rapidfuzz import fuzz
+
+# Folder names must score above this against an artist name to match
+FOLDER_MATCH_THRESHOLD = 80
+# Number of names scored exactly for each query
+DEFAULT_CANDIDATES = 25
+
+
+def _trigrams(text):
+    """Character trigrams of `text`, padded so short names still produce grams."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to normalized names.
+    A query only fuzzy-scores the few names sharing the most trigrams with it,
+    instead of every name in the index.
+    """
+
+    def __init__(self, names=()):
+        self.values = {}
+        self.postings = defaultdict(set)
+        for name, value in names:
+            self.add(name, value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, name, value):
+        if not name or name in self.values:
+            return
+        self.values[name] = value
+        for gram in _trigrams(name):
+            self.postings[gram].add(name)
+
+    def candidates(self, query, limit=DEFAULT_CANDIDATES):
+        """Returns up to `limit` indexed names sharing the most trigrams with `query`."""
+        counts = Counter()
+        for gram in _trigrams(query):
+            counts.update(self.postings.get(gram, ()))
+        return [name for name, _ in counts.most_common(limit)]
+
+    def best_match(self, query, threshold=FOLDER_MATCH_THRESHOLD, limit=DEFAULT_CANDIDATES):
+        """Returns (value, score) of the best candidate scoring above `threshold`, or (None, 0)."""
+        best_name, best_score = None, threshold
+        for name in self.candidates(query, limit):
+            score = fuzz.ratio(query, name)
+            if score > best_score:
+                best_name, best_score = name, score
+        if best_name is None:
+            return None, 0
+        return self.values[best_name], best_score
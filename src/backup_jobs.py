@@ -0,0 +1,144 @@
+# src/backup_jobs.py
+
+"""
+Backup jobs listed under "jobs" in config.json. Each job copies one Spotify
+account's liked songs, or one playlist, into its own worksheet. Every job
+keeps its own Spotify token cache (.cache-<name>), so jobs can belong to
+different accounts.
+"""
+
+import os
+import re
+from typing import NamedTuple
+from src.spotify_pages import fetch_all_saved_tracks, fetch_saved_tracks_since, fetch_all_playlist_items, DEFAULT_FETCH_WORKERS
+
+DEFAULT_SPREADSHEET = "Music Saved Tracks"
+# Liked songs need user-library-read; private and collaborative playlists need the playlist scopes
+JOB_SCOPE = "user-library-read playlist-read-private playlist-read-collaborative"
+# Job names become part of the token cache file name
+JOB_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class BackupJob(NamedTuple):
+    """One Spotify source (liked songs, or a playlist) and the worksheet it is backed up to."""
+    name: str
+    playlist: str  # playlist ID, URI or URL; None for the account's liked songs
+    spreadsheet: str
+    worksheet: str  # worksheet title; None for the first worksheet
+    client_id: str
+    client_secret: str
+    redirect_uri: str
+
+    @property
+    def cache_path(self):
+        return f".cache-{self.name}"
+
+    @property
+    def source(self):
+        return f"playlist {self.playlist}" if self.playlist else "liked songs"
+
+    @property
+    def target(self):
+        return (self.spreadsheet, self.worksheet)
+
+
+def parse_backup_jobs(config_jobs, args, names=None):
+    """
+    Builds a BackupJob for every entry of the config.json "jobs" list, taking
+    Spotify credentials from `args` unless the entry sets its own. Only the
+    jobs in `names` are returned when it is not empty. Raises ValueError if an
+    entry is invalid or two jobs would write to the same worksheet.
+    """
+    jobs = []
+    for number, entry in enumerate(config_jobs, start=1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"jobs entry {number} is not an object")
+        name = str(entry.get("name", ""))
+        if not JOB_NAME_PATTERN.match(name):
+            raise ValueError(f"jobs entry {number} needs a \"name\" made of letters, digits, '.', '_' or '-'")
+        job = BackupJob(
+            name=name,
+            playlist=entry.get("playlist") or None,
+            spreadsheet=entry.get("spreadsheet") or DEFAULT_SPREADSHEET,
+            worksheet=entry.get("worksheet") or None,
+            client_id=entry.get("client_id") or getattr(args, "client_id", None),
+            client_secret=entry.get("client_secret") or getattr(args, "client_secret", None),
+            redirect_uri=entry.get("redirect_uri") or getattr(args, "redirect_uri", None),
+        )
+        for field in ("client_id", "client_secret", "redirect_uri"):
+            if not getattr(job, field):
+                raise ValueError(f"job '{name}' has no {field} (set it on the job or in \"args\")")
+        jobs.append(job)
+
+    job_names = [job.name for job in jobs]
+    duplicates = sorted(set(name for name in job_names if job_names.count(name) > 1))
+    if duplicates:
+        raise ValueError(f"job names must be unique: {', '.join(duplicates)}")
+    # Two jobs appending to one worksheet at once would each miss the other's rows when deduplicating
+    targets = {}
+    for job in jobs:
+        if job.target in targets:
+            raise ValueError(f"jobs '{targets[job.target]}' and '{job.name}' write to the same worksheet")
+        targets[job.target] = job.name
+
+    if names:
+        unknown = sorted(set(names) - set(job_names))
+        if unknown:
+            raise ValueError(f"no job named {', '.join(unknown)} in config.json")
+        jobs = [job for job in jobs if job.name in names]
+    return jobs
+
+
+def open_spotify(job):
+    """Returns a Spotify client for `job`, authorized up front (this may open a browser the first time)."""
+    import spotipy
+    from spotipy.oauth2 import SpotifyOAuth
+
+    auth_manager = SpotifyOAuth(
+        scope=JOB_SCOPE,
+        client_id=job.client_id,
+        client_secret=job.client_secret,
+        redirect_uri=job.redirect_uri,
+        cache_path=job.cache_path,
+    )
+    auth_manager.get_access_token(as_dict=False)
+    return spotipy.Spotify(auth_manager=auth_manager)
+
+
+def remove_token_cache(job):
+    """Deletes the job's token cache, so the next run asks for authorization again."""
+    if os.path.exists(job.cache_path):
+        os.remove(job.cache_path)
+        return True
+    return False
+
+
+def auth_error_message(job, error):
+    """
+    Describes a failed Spotify authorization of `job`. Only a revoked or expired
+    sign-in (`invalid_grant`) removes the job's token cache; other errors, such as
+    the token endpoint being down for a while, keep it for the next run.
+    """
+    message = f"Spotify authorization failed ({error})"
+    if getattr(error, "error", None) == "invalid_grant" and remove_token_cache(job):
+        message += f"; removed {job.cache_path}, re-run to sign in again"
+    return message
+
+
+def fetch_job_songs(sp, job, since=None, full=False, workers=DEFAULT_FETCH_WORKERS):
+    """
+    Returns the job's songs added after `since` (an ISO 8601 `added_at`; None
+    for all), oldest first. `full` fetches all liked songs with concurrent requests.
+    Tracks in old playlists can have no `added_at`; they are only returned when
+    `since` is None, and sort first.
+    """
+    if job.playlist:
+        items = fetch_all_playlist_items(sp, job.playlist, workers)
+    elif full:
+        items = fetch_all_saved_tracks(sp, workers)
+    else:
+        return list(reversed(fetch_saved_tracks_since(sp, since)))
+    if since:
+        items = [item for item in items if item['added_at'] and item['added_at'] > since]
+    # sorted() is stable, so songs added at the same time keep their playlist order
+    return sorted(items, key=lambda item: item['added_at'] or '')
@@ -0,0 +1,211 @@
+# src/fingerprint.py
+
+"""
+Optional acoustic fingerprint tier for files without usable tags.
+Fingerprints come from Chromaprint's `fpcalc` tool (https://acoustid.org/chromaprint),
+which must be installed and on the PATH. Only the first few seconds of each
+file are decoded, and fpcalc runs on a process pool next to the scan.
+"""
+
+import os
+import shutil
+import subprocess
+from array import array
+from collections import Counter, defaultdict
+
+FPCALC = "fpcalc"
+# Seconds of audio decoded per file, which bounds the CPU cost of a fingerprint
+FINGERPRINT_SECONDS = 30
+FPCALC_TIMEOUT_SECONDS = 60
+# Two fingerprints are the same recording when at most this fraction of their bits differ
+MAX_BIT_ERROR_RATE = 0.3
+# Fingerprint values are indexed by their top bits only, so re-encoded copies still share index keys
+INDEX_SHIFT = 12
+# Index keys a reference must share with a query to be compared in full
+MIN_SHARED_KEYS = 3
+# References compared in full per lookup
+MAX_CANDIDATES = 5
+# Alignment shifts tried when comparing, for files whose audio starts slightly earlier or later
+MAX_OFFSET = 2
+# Fewer overlapping values than this cannot confirm a match
+MIN_OVERLAP = 20
+
+
+def fpcalc_available():
+    return shutil.which(FPCALC) is not None
+
+
+def compute_fingerprint(path, seconds=FINGERPRINT_SECONDS):
+    """Returns the raw Chromaprint fingerprint of the first `seconds` of `path` as a tuple of ints, or None."""
+    try:
+        result = subprocess.run(
+            [FPCALC, "-raw", "-length", str(seconds), path],
+            capture_output=True, text=True, timeout=FPCALC_TIMEOUT_SECONDS,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    for line in result.stdout.splitlines():
+        if line.startswith("FINGERPRINT="):
+            try:
+                return tuple(int(value) & 0xFFFFFFFF for value in line[len("FINGERPRINT="):].split(",") if value)
+            except ValueError:
+                return None
+    return None
+
+
+def pack_fingerprint(fingerprint):
+    return array('I', fingerprint).tobytes()
+
+
+def unpack_fingerprint(data):
+    values = array('I')
+    values.frombytes(data)
+    return tuple(values)
+
+
+def bit_error_rate(a, b):
+    """Fraction of differing bits between two fingerprints at their best alignment (1.0 if too short to tell)."""
+    best = 1.0
+    for offset in range(-MAX_OFFSET, MAX_OFFSET + 1):
+        pairs = zip(a[offset:], b) if offset >= 0 else zip(a, b[-offset:])
+        errors = overlap = 0
+        for x, y in pairs:
+            errors += (x ^ y).bit_count()
+            overlap += 1
+        if overlap >= MIN_OVERLAP:
+            best = min(best, errors / (32 * overlap))
+    return best
+
+
+class FingerprintIndex:
+    """
+    Inverted index from fingerprint values to the references containing them.
+    A lookup only compares in full the few references sharing the most values
+    with the query, and accepts the closest one by bit error rate.
+    """
+
+    def __init__(self):
+        self.fingerprints = {}
+        self.postings = defaultdict(set)
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def add(self, key, fingerprint):
+        if not fingerprint or key in self.fingerprints:
+            return
+        self.fingerprints[key] = fingerprint
+        for value in set(fingerprint):
+            self.postings[value >> INDEX_SHIFT].add(key)
+
+    def best_match(self, fingerprint, max_error=MAX_BIT_ERROR_RATE):
+        """Returns (key, bit error rate) of the closest reference within `max_error`, or (None, 1.0)."""
+        if not fingerprint:
+            return None, 1.0
+        counts = Counter()
+        for index_key in set(value >> INDEX_SHIFT for value in fingerprint):
+            counts.update(self.postings.get(index_key, ()))
+        best_key, best_error = None, 1.0
+        for key, shared in counts.most_common(MAX_CANDIDATES):
+            if shared < MIN_SHARED_KEYS:
+                break
+            error = bit_error_rate(fingerprint, self.fingerprints[key])
+            if error < best_error:
+                best_key, best_error = key, error
+        if best_key is None or best_error > max_error:
+            return None, 1.0
+        return best_key, best_error
+
+
+class FingerprintTier:
+    """
+    Identifies untagged files by fingerprint. References are files already
+    matched to a sheet song: their fingerprints are kept in the metadata cache
+    with the song's artist and title, so they carry over to later scans.
+    Fingerprints are cached by path, size and mtime, and computed on a
+    process pool as files are submitted; results are collected afterwards.
+    """
+
+    def __init__(self, cache, seconds=FINGERPRINT_SECONDS, workers=None):
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.cache = cache
+        self.seconds = seconds
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.index = FingerprintIndex()
+        self.identities = {}  # reference path -> (artist, title)
+        self.untagged = []  # (filepath, fallback artist, stat, future or fingerprint)
+        self.references = []  # (filepath, artist, title, stat, future or fingerprint)
+        self.identified = 0
+        for path, fingerprint, artist, title in cache.fingerprint_references(seconds):
+            self._add_reference(path, fingerprint, artist, title)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _add_reference(self, path, fingerprint, artist, title):
+        self.identities[path] = (artist, title)
+        self.index.add(path, fingerprint)
+
+    def _start(self, filepath):
+        """Returns (stat, cached fingerprint or a future computing it)."""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None, None
+        hit, fingerprint = self.cache.get_fingerprint(filepath, stat, self.seconds)
+        if hit:
+            return stat, fingerprint
+        return stat, self.executor.submit(compute_fingerprint, filepath, self.seconds)
+
+    def _finish(self, filepath, stat, pending):
+        if pending is None or isinstance(pending, tuple):
+            return pending
+        fingerprint = pending.result()
+        self.cache.put_fingerprint(filepath, stat, self.seconds, fingerprint)
+        return fingerprint
+
+    def submit_untagged(self, filepath, fallback_artist=None):
+        """Starts fingerprinting a file without tags; `fallback_artist` is kept for resolve_untagged."""
+        stat, pending = self._start(filepath)
+        if stat is not None:
+            self.untagged.append((filepath, fallback_artist, stat, pending))
+
+    def submit_reference(self, filepath, artist, title):
+        """Starts fingerprinting a file matched to the sheet song (artist, title)."""
+        if filepath in self.identities:
+            return
+        stat, pending = self._start(filepath)
+        if stat is not None:
+            self.references.append((filepath, artist, title, stat, pending))
+
+    def store_references(self, persist=True):
+        """Adds the submitted references to the index, and to the cache when `persist` is set."""
+        for filepath, artist, title, stat, pending in self.references:
+            fingerprint = self._finish(filepath, stat, pending)
+            if not fingerprint:
+                continue
+            self._add_reference(filepath, fingerprint, artist, title)
+            if persist:
+                self.cache.set_fingerprint_identity(filepath, artist, title)
+        self.references = []
+
+    def resolve_untagged(self):
+        """Yields (filepath, fallback artist, (artist, title) or None) for every submitted untagged file."""
+        for filepath, fallback_artist, stat, pending in self.untagged:
+            fingerprint = self._finish(filepath, stat, pending)
+            key, _ = self.index.best_match(fingerprint)
+            identity = self.identities.get(key) if key is not None and key != filepath else None
+            if identity:
+                self.identified += 1
+            yield filepath, fallback_artist, identity
+        self.untagged = []
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,255 @@
+# src/library_watcher.py
+
+"""
+Long-running watch over the local music library. New or modified audio files
+are matched against the pending sheet rows as they arrive, instead of
+re-walking the library. Uses inotify on Linux when the optional
+`inotify_simple` package is installed, and polls the library otherwise.
+"""
+
+import os
+import time
+from src.local_scanner import (
+    AUDIO_EXTENSIONS, iter_audio_files, get_cached_audio_metadata, clean_filename,
+    _folder_artist, _read_pending_songs, _update_sheet,
+)
+from src.local_store import DEFAULT_LOCAL_STORE
+from src.metadata_cache import MetadataCache
+from src.sheet_writer import DEFAULT_BATCH_SIZE
+from src.profiling import profiled
+
+# A file is matched once no event has been seen for it for this long, so large downloads finish first
+DEBOUNCE_SECONDS = 5
+# Seconds between library walks when inotify is not available
+POLL_INTERVAL_SECONDS = 30
+# Seconds between checks for rows added to the sheet since the watch started
+SHEET_REFRESH_SECONDS = 15 * 60
+# Longest single wait for events, so the sheet refresh is not delayed
+MAX_WAIT_SECONDS = 60
+
+
+def _is_audio_file(path):
+    return os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS
+
+
+class InotifyWatcher:
+    """Reports audio files written or moved into any folder under `root`, using inotify."""
+
+    name = "inotify"
+    # inotify reports a file once it is closed after writing, so no extra settling time is needed
+    settle_seconds = 0
+
+    def __init__(self, root):
+        from inotify_simple import INotify, flags
+
+        self.flags = flags
+        self.inotify = INotify()
+        self.mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+        self.folders = {}  # watch descriptor -> folder path
+        self._watch_tree(root)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _watch_tree(self, folder):
+        """Watches `folder` and its subfolders, and returns the audio files already in them."""
+        found = []
+        for dirpath, _, filenames in os.walk(folder):
+            try:
+                self.folders[self.inotify.add_watch(dirpath, self.mask)] = dirpath
+            except OSError as e:
+                print(f"Could not watch {dirpath}: {e}")
+                continue
+            found.extend(os.path.join(dirpath, name) for name in filenames if _is_audio_file(name))
+        return found
+
+    def read(self, timeout):
+        """Waits up to `timeout` seconds and returns the audio files that changed."""
+        flags = self.flags
+        changed = []
+        for event in self.inotify.read(timeout=int(timeout * 1000)):
+            if event.mask & flags.Q_OVERFLOW:
+                print("Warning: Too many file events at once; some new files may be missed until the next scan.")
+                continue
+            if event.mask & flags.IGNORED:
+                self.folders.pop(event.wd, None)
+                continue
+            folder = self.folders.get(event.wd)
+            if folder is None or not event.name:
+                continue
+            path = os.path.join(folder, event.name)
+            if event.mask & flags.ISDIR:
+                # A new or moved-in folder (e.g. a whole album) may already hold files
+                changed.extend(self._watch_tree(path))
+            elif event.mask & (flags.CLOSE_WRITE | flags.MOVED_TO) and _is_audio_file(path):
+                changed.append(path)
+        return changed
+
+    def close(self):
+        self.inotify.close()
+
+
+class PollingWatcher:
+    """Reports audio files whose size or modification time changed between walks of `root`."""
+
+    name = "polling"
+
+    def __init__(self, root, interval=POLL_INTERVAL_SECONDS):
+        self.root = root
+        self.interval = interval
+        # A file still changing shows up again at the next walk, so wait for that walk before matching it
+        self.settle_seconds = interval + 1
+        self.files = self._walk()
+        self.next_poll = time.monotonic() + interval
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def _walk(self):
+        files = {}
+        for entry in iter_audio_files(self.root):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def read(self, timeout):
+        wait = self.next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0, wait))
+        files = self._walk()
+        changed = [path for path, signature in files.items() if self.files.get(path) != signature]
+        self.files = files
+        self.next_poll = time.monotonic() + self.interval
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(root, poll_interval=POLL_INTERVAL_SECONDS):
+    """Returns an InotifyWatcher when inotify is available, and a PollingWatcher otherwise."""
+    try:
+        return InotifyWatcher(root)
+    except ImportError:
+        print("inotify_simple is not installed (pip install inotify_simple). Polling the library instead.")
+    except OSError as e:
+        print(f"Could not use inotify ({e}). Polling the library instead.")
+    return PollingWatcher(root, poll_interval)
+
+
+class Debouncer:
+    """Holds changed paths until no new change has been reported for them for `quiet_seconds`."""
+
+    def __init__(self, quiet_seconds):
+        self.quiet_seconds = quiet_seconds
+        self.last_change = {}
+
+    def __len__(self):
+        return len(self.last_change)
+
+    def touch(self, paths):
+        now = time.monotonic()
+        for path in paths:
+            self.last_change[path] = now
+
+    def pop_ready(self):
+        now = time.monotonic()
+        ready = [path for path, changed in self.last_change.items() if now - changed >= self.quiet_seconds]
+        for path in ready:
+            del self.last_change[path]
+        return ready
+
+    def seconds_until_ready(self):
+        """Seconds until the next path is ready, or None when nothing is waiting."""
+        if not self.last_change:
+            return None
+        return max(0, min(self.last_change.values()) + self.quiet_seconds - time.monotonic())
+
+
+@profiled("watch.match_files")
+def _match_new_files(paths, scan_path, cache, matcher, songs_to_find):
+    """Matches changed files against the pending rows. Matched rows are removed and returned."""
+    from src.matcher import MATCH_THRESHOLD
+
+    matches = []
+    for filepath in paths:
+        if not os.path.isfile(filepath):
+            continue
+        file_artist, title = get_cached_audio_metadata(filepath, cache)
+        if not title:
+            file_artist, title = clean_filename(os.path.basename(filepath))
+        if not file_artist:
+            file_artist = _folder_artist(scan_path, filepath)
+        if not title:
+            continue
+        song_index, score = matcher.best_match(file_artist, title)
+        if score > MATCH_THRESHOLD:
+            song = songs_to_find.pop(song_index)
+            matcher.remove(song_index)
+            matches.append(song)
+            print(f"Match found! (Score: {int(score)}%) - File: '{os.path.basename(filepath)}' matched to Sheet: '{song.title}' by '{song.artist}'")
+    cache.commit()
+    return matches
+
+
+def watch_music_library(sheet, scan_path, mode, batch_size=DEFAULT_BATCH_SIZE, local_store=DEFAULT_LOCAL_STORE,
+                        poll_interval=POLL_INTERVAL_SECONDS, debounce=DEBOUNCE_SECONDS):
+    """
+    Watches `scan_path` until interrupted with Ctrl+C. Audio files created or
+    modified while watching are matched against the pending sheet rows, and
+    each burst of matches is written to the sheet and local store right away.
+    Files already in the library are not scanned; run --scan-local for those.
+    """
+    from src.matcher import SongMatcher
+
+    if not os.path.isdir(scan_path):
+        print(f"Error: Scan path does not exist: {scan_path}")
+        return
+    scan_path = os.path.normpath(scan_path)
+
+    pending = _read_pending_songs(sheet)
+    if pending is None:
+        return
+    acquirement_col_index, triaged_col_index, songs_to_find = pending
+    matcher = SongMatcher((song.index, song.title, song.artist) for song in songs_to_find.values())
+    refreshed_at = time.monotonic()
+
+    with MetadataCache() as cache, open_watcher(scan_path, poll_interval) as watcher:
+        debouncer = Debouncer(max(debounce, watcher.settle_seconds))
+        print(f"Watching {scan_path} ({watcher.name}) for {len(songs_to_find)} pending songs. Press Ctrl+C to stop.")
+        try:
+            while True:
+                until_ready = debouncer.seconds_until_ready()
+                timeout = MAX_WAIT_SECONDS if until_ready is None else min(until_ready, MAX_WAIT_SECONDS)
+                debouncer.touch(watcher.read(timeout))
+
+                ready = debouncer.pop_ready()
+                if ready:
+                    matches = _match_new_files(ready, scan_path, cache, matcher, songs_to_find)
+                    if matches:
+                        _update_sheet(sheet, matches, acquirement_col_index, triaged_col_index, mode, batch_size, local_store)
+
+                # Pick up rows added to the sheet (e.g. by a Spotify backup) since the watch started
+                refresh = getattr(sheet, 'refresh', None)
+                if refresh is not None and time.monotonic() - refreshed_at >= SHEET_REFRESH_SECONDS:
+                    refreshed_at = time.monotonic()
+                    if refresh():
+                        pending = _read_pending_songs(sheet)
+                        if pending is not None:
+                            acquirement_col_index, triaged_col_index, songs_to_find = pending
+                            matcher = SongMatcher((song.index, song.title, song.artist) for song in songs_to_find.values())
+                            print(f"Google Sheet changed. Now watching for {len(songs_to_find)} pending songs.")
+        except KeyboardInterrupt:
+            print("Stopped watching.")
@@ -1,23 +1,41 @@
 # src/local_scanner.py
 
 import os
-from mutagen.easyid3 import EasyID3
-from mutagen.mp3 import MP3
-from mutagen import MutagenError
-from thefuzz import fuzz
-from excel import update_excel_row
-from unidecode import unidecode
-from tqdm import tqdm
-
-# List of audio file extensions to scan
-AUDIO_EXTENSIONS = ['.mp3', '.flac', '.m4a', '.ogg', '.wav']
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.local_store import open_local_store, DEFAULT_LOCAL_STORE
+from src.sheet_writer import SheetWriteBuffer, DEFAULT_BATCH_SIZE
+from src.metadata_cache import MetadataCache
+from src.fingerprint import FingerprintTier, FINGERPRINT_SECONDS, fpcalc_available
+from src.scan_checkpoint import ScanCheckpoint
+from src.song import parseSheetRows
+from src.normalize import normalize
+from src.profiling import timed, profiled, timed_iter
+# mutagen, rapidfuzz and tqdm (and unidecode, in src/normalize.py) are imported by
+# the functions that use them, so importing this module for its defaults does not load them
+
+# Lowercased audio file extensions to scan
+AUDIO_EXTENSIONS = frozenset(['.mp3', '.flac', '.m4a', '.ogg', '.wav'])
+# Top-level folders that match no artist and are named like an index (one letter, digit or '#',
+# or a range such as 'A-C', '0-9' or 'A-Z') are index folders; their subfolders are matched as artist folders too.
+# Short artist names such as 'U2' or 'ABC' are not index folders
+BUCKET_FOLDER_PATTERN = re.compile(r"^\s*(?:[0-9a-z#]|[0-9a-z]\s*[-\u2013]\s*[0-9a-z])\s*$", re.IGNORECASE)
+# Default number of threads reading tags concurrently
+DEFAULT_WORKERS = 4
+# Files in flight per worker before the walk waits for the matcher to catch up
+PENDING_PER_WORKER = 4
+# 'artists' walks only folders named like a pending artist; 'library' indexes every file once
+SCAN_STRATEGIES = ('artists', 'library')
+DEFAULT_SCAN_STRATEGY = 'artists'
 
 def clean_filename(filename):
-    """Cleans a filename to extract potential artist and title."""
+    """
+    Cleans a filename to extract potential artist and title.
+    Both are left as written; the matcher normalizes them.
+    """
     # Remove extension
     name = os.path.splitext(filename)[0]
-    # Transliterate to ASCII to handle non-standard characters
-    name = unidecode(name)
     # Common separators
     separators = [' - ', ' – ', ' _ ']
     for sep in separators:
@@ -27,196 +45,613 @@ def clean_filename(filename):
     # If no separator, assume the whole name is the title
     return None, name.strip()
 
-def get_audio_metadata(filepath):
-    """Extracts metadata (artist and title) from an audio file."""
+def _read_error(error):
+    """Returns the OSError behind `error` (mutagen wraps them in MutagenError), or None."""
+    while error is not None:
+        if isinstance(error, OSError):
+            return error
+        error = error.__cause__ or error.__context__
+    return None
+
+# src.tag_readers.read_tags, imported by the first tag read since it loads mutagen
+_read_tags = None
+
+@profiled("scan.read_tags")
+def get_audio_metadata(filepath, raise_read_errors=False):
+    """
+    Extracts metadata (artist and title) from an audio file.
+    Files without readable tags give (None, None). So do read errors, such as a
+    network share timing out, unless `raise_read_errors` is set: they then raise OSError.
+    """
+    global _read_tags
+    if _read_tags is None:
+        from src.tag_readers import read_tags as _read_tags
+
     try:
-        if filepath.endswith('.mp3'):
-            audio = MP3(filepath, ID3=EasyID3)
-            artist = audio.get('artist', [None])[0]
-            title = audio.get('title', [None])[0]
-            return artist, title
-        # Add handlers for other file types (flac, m4a) if needed
-    except (MutagenError, Exception) as e:
+        # Readers are registered per extension in src/tag_readers.py
+        return _read_tags(filepath)
+    except Exception as e:
         # print(f"Could not read metadata for {filepath}: {e}")
-        pass
+        read_error = _read_error(e)
+        if raise_read_errors and read_error is not None:
+            raise read_error
     return None, None
 
+def iter_audio_files(folder_path):
+    """
+    Walks `folder_path` with os.scandir and yields a DirEntry for every audio file.
+    Directories are read once and extensions are matched case-insensitively.
+    """
+    stack = [folder_path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                subdirs = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS:
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        # Reversed so subfolders are visited in directory order
+        stack.extend(reversed(subdirs))
+
+def _entry_stat(entry):
+    try:
+        return entry.stat()
+    except OSError:
+        return None
+
+def get_cached_audio_metadata(filepath, cache=None, stat=None):
+    """Like get_audio_metadata, but skips opening files whose size and mtime are unchanged in `cache`."""
+    if cache is None:
+        return get_audio_metadata(filepath)
+    if stat is None:
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None, None
+    hit, artist, title = cache.get(filepath, stat)
+    if hit:
+        return artist, title
+    try:
+        artist, title = get_audio_metadata(filepath, raise_read_errors=True)
+    except OSError:
+        # Not cached, so the file is read again next time instead of staying untagged
+        return None, None
+    cache.put(filepath, stat, artist, title)
+    return artist, title
+
+def _iter_audio_metadata(entries, cache=None, executor=None, max_pending=1):
+    """
+    Yields (filepath, artist, title) for each DirEntry, in order.
+    Cache lookups and writes stay on the calling thread; tag reads for cache
+    misses run on `executor`, with at most `max_pending` files in flight.
+    Closing the generator early cancels reads that have not started yet.
+    """
+    if executor is None:
+        for entry in entries:
+            if cache is None:
+                yield (entry.path,) + get_audio_metadata(entry.path)
+                continue
+            stat = _entry_stat(entry)
+            if stat is None:
+                yield entry.path, None, None
+                continue
+            yield (entry.path,) + get_cached_audio_metadata(entry.path, cache, stat)
+        return
+
+    pending = deque()
+
+    def resolve(item):
+        filepath, stat, future, artist, title = item
+        if future is not None:
+            try:
+                artist, title = future.result()
+            except OSError:
+                # Read errors are only raised when caching, and are not cached
+                return filepath, None, None
+            if cache is not None and stat is not None:
+                cache.put(filepath, stat, artist, title)
+        return filepath, artist, title
+
+    try:
+        for entry in entries:
+            filepath = entry.path
+            stat = None
+            if cache is not None:
+                stat = _entry_stat(entry)
+                if stat is None:
+                    pending.append((filepath, None, None, None, None))
+                    continue
+                hit, artist, title = cache.get(filepath, stat)
+                if hit:
+                    pending.append((filepath, stat, None, artist, title))
+                    continue
+            pending.append((filepath, stat, executor.submit(get_audio_metadata, filepath, cache is not None), None, None))
+            while len(pending) >= max_pending:
+                yield resolve(pending.popleft())
+        while pending:
+            yield resolve(pending.popleft())
+    finally:
+        # Keep reads that already finished so the next scan does not repeat them
+        for filepath, stat, future, _, _ in pending:
+            if future is None:
+                continue
+            if future.cancel():
+                continue
+            if cache is not None and stat is not None and future.done() and future.exception() is None:
+                cache.put(filepath, stat, *future.result())
+
+@profiled("scan.find_match_in_sheet")
 def find_match_in_sheet(local_artist, local_title, sheet_songs):
-    """Finds the best match for a local song in the sheet data using fuzzy matching."""
-    best_match = None
-    highest_score = 0
+    """
+    Finds the best match for a local song in the sheet data using fuzzy matching.
+    Returns (None, 0, -1) if no song scores above MATCH_THRESHOLD.
+    """
+    from src.matcher import SongMatcher
 
-    if not local_title:
+    matcher = SongMatcher((i, song.get('Title'), song.get('Artist')) for i, song in enumerate(sheet_songs))
+    index, score = matcher.best_match(local_artist, local_title)
+    if index is None:
         return None, 0, -1
+    return sheet_songs[index], score, index
 
-    for i, song in enumerate(sheet_songs):
-        sheet_title = song.get('Title')
-        sheet_artist = song.get('Artist')
 
-        if not sheet_title or not sheet_artist:
-            continue
+def _is_bucket_folder(folder_name):
+    return BUCKET_FOLDER_PATTERN.match(folder_name) is not None
 
-        # Calculate similarity
-        title_score = fuzz.ratio(local_title.lower(), sheet_title.lower())
-        artist_score = fuzz.ratio(local_artist.lower(), sheet_artist.lower()) if local_artist else 50
+@profiled("scan.find_artist_folders")
+def _find_artist_folders(scan_path, target_artists):
+    """
+    Returns (folder path, artist) pairs for top-level folders whose names fuzzily
+    match a target artist, plus matching folders one level below index folders
+    such as 'A-Z/Artist'. Each folder name is only scored against the artists
+    returned by a trigram index lookup.
+    """
+    from src.artist_index import TrigramIndex
 
-        score = (title_score * 0.7) + (artist_score * 0.3)
+    # Map normalized artist names to original for fuzzy matching
+    artist_index = TrigramIndex((normalize(artist, "scan.artists"), artist) for artist in target_artists)
 
-        if score > highest_score:
-            highest_score = score
-            best_match = (i, song)
-    
-    if best_match:
-        return best_match[1], highest_score, best_match[0]
-    
-    return None, 0, -1
+    artist_folders = []
+    bucket_folders = []
+    for entry in os.scandir(scan_path):
+        if entry.is_dir():
+            artist, _ = artist_index.best_match(normalize(entry.name, "scan.folders"))
+            if artist:
+                artist_folders.append((entry.path, artist))
+            elif _is_bucket_folder(entry.name):
+                bucket_folders.append(entry.path)
+
+    for bucket_path in bucket_folders:
+        try:
+            with os.scandir(bucket_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        artist, _ = artist_index.best_match(normalize(entry.name, "scan.folders"))
+                        if artist:
+                            artist_folders.append((entry.path, artist))
+        except OSError:
+            continue
+    return artist_folders
 
+@profiled("scan.scan_files")
+def _scan_files(scan_path, songs_to_find, cache=None, executor=None, max_pending=1, fingerprints=None, matched_files=None,
+                checkpoint=None):
+    """
+    Scans artist folders for the pending sheet rows in `songs_to_find`, a dict of
+    SheetRow keyed by row index. Matched rows are removed from it and returned.
+    With a FingerprintTier, untagged files are handed to it instead of being
+    matched by file name. (filepath, song) pairs are added to `matched_files`.
+    Folders done in `checkpoint` are skipped, and finished folders are added to it,
+    except folders with untagged files: those are only matched once the whole
+    scan is done, so a resumed scan has to walk them again.
+    """
+    from tqdm import tqdm
+    from src.matcher import SongMatcher, MATCH_THRESHOLD
 
-def _scan_files(scan_path, songs_to_find, sheet_songs):
     matches_to_update = []
     normalized_scan_path = os.path.normpath(scan_path)
 
     # Build a set of unique artist names to look for
-    target_artists = set(song.get('Artist', '').strip() for song in songs_to_find if song.get('Artist'))
-
-    # Map normalized artist names to original for fuzzy matching
-    normalized_artist_map = {unidecode(artist).lower(): artist for artist in target_artists}
+    target_artists = set(song.artist for song in songs_to_find.values() if song.artist)
 
     # Find candidate artist folders
-    artist_folders = []
-    for entry in os.scandir(normalized_scan_path):
-        if entry.is_dir():
-            folder_name = unidecode(entry.name).lower()
-            for norm_artist, orig_artist in normalized_artist_map.items():
-                if fuzz.ratio(folder_name, norm_artist) > 80:
-                    artist_folders.append((entry.path, orig_artist))
-                    break
+    artist_folders = _find_artist_folders(normalized_scan_path, target_artists)
+    if checkpoint is not None and checkpoint.done_folders:
+        remaining = [folder for folder in artist_folders if folder[0] not in checkpoint.done_folders]
+        if len(remaining) < len(artist_folders):
+            print(f"Skipping {len(artist_folders) - len(remaining)} folders scanned before the interruption.")
+        artist_folders = remaining
 
     # Only scan files in matched artist folders
     print(f"Found {len(artist_folders)} likely artist folders to scan:")
     # Build a map of artist to their songs to find
     artist_to_songs = {}
-    for song in songs_to_find:
-        artist = song.get('Artist', '').strip()
-        if artist:
-            artist_to_songs.setdefault(artist, []).append(song)
+    for song in songs_to_find.values():
+        if song.artist:
+            artist_to_songs.setdefault(song.artist, {})[song.index] = song
+    # Matchers are built once per artist, since several folders can map to the same artist
+    artist_matchers = {}
 
-    total_files = 0
-    for folder_path, _ in artist_folders:
-        for _, _, files in os.walk(folder_path):
-            total_files += sum(1 for file in files if any(file.endswith(ext) for ext in AUDIO_EXTENSIONS))
-    print(f"Found {total_files} audio files in likely artist folders. Starting scan...")
+    print("Starting scan...")
 
+    # Folders are walked once while scanning, so the file bar counts up without a total
     with tqdm(total=len(artist_folders), desc="Artist folders", unit="artist", ncols=80) as artist_pbar:
-        with tqdm(total=total_files, desc="Scanning local files", unit="file", ncols=100, leave=False) as file_pbar:
+        with tqdm(desc="Scanning local files", unit="file", ncols=100, leave=False) as file_pbar:
             for folder_path, artist in artist_folders:
                 # Only consider songs for this artist
-                songs_needed = artist_to_songs.get(artist, [])
+                songs_needed = artist_to_songs.get(artist, {})
                 if not songs_needed:
                     artist_pbar.update(1)
                     continue
+                if artist not in artist_matchers:
+                    with timed("scan.build_matcher"):
+                        artist_matchers[artist] = SongMatcher((song.index, song.title, song.artist) for song in songs_needed.values())
+                matcher = artist_matchers[artist]
                 found_titles = set()
-                for root, _, files in os.walk(folder_path):
-                    for file in files:
-                        if not any(file.endswith(ext) for ext in AUDIO_EXTENSIONS):
+                seen_paths = set()
+                has_untagged = False
+                entries = timed_iter("scan.walk", iter_audio_files(folder_path))
+                metadata = timed_iter("scan.next_file", _iter_audio_metadata(entries, cache, executor, max_pending))
+                for filepath, file_artist, title in metadata:
+                    file = os.path.basename(filepath)
+                    seen_paths.add(filepath)
+
+                    if not title:
+                        if fingerprints is not None:
+                            fingerprints.submit_untagged(filepath, artist)
+                            has_untagged = True
+                            file_pbar.update(1)
                             continue
+                        file_artist, title = clean_filename(file)
 
-                        filepath = os.path.join(root, file)
-                        file_artist, title = get_audio_metadata(filepath)
+                    # Use the artist from the folder if metadata is missing
+                    if not file_artist:
+                        file_artist = artist
 
-                        if not title:
-                            file_artist, title = clean_filename(file)
+                    if not title or title in found_titles:
+                        file_pbar.update(1)
+                        continue
+
+                    # Only try to match against songs for this artist
+                    with timed("scan.match"):
+                        song_index, score = matcher.best_match(file_artist, title)
+
+                    if score > MATCH_THRESHOLD:
+                        matched_song = songs_needed.pop(song_index)
+                        file_pbar.write(f"Match found! (Score: {int(score)}%) - File: '{file}' matched to Sheet: '{matched_song.title}' by '{matched_song.artist}'")
+                        matches_to_update.append(matched_song)
+                        if matched_files is not None:
+                            matched_files.append((filepath, matched_song))
+                        found_titles.add(title)
+                        # Remove from the matcher and songs_to_find as well
+                        matcher.remove(song_index)
+                        songs_to_find.pop(song_index, None)
+                        # If all songs for this artist found, break
+                        if not songs_needed:
+                            break
+                    file_pbar.update(1)
+                metadata.close()
+                # Only a complete walk of the folder tells which cached files were deleted
+                if cache is not None and songs_needed:
+                    cache.evict_missing(folder_path, seen_paths)
+                if checkpoint is not None and not has_untagged:
+                    checkpoint.folder_done(folder_path)
+                artist_pbar.update(1)
+    return matches_to_update
 
-                        # Use the artist from the folder if metadata is missing
-                        if not file_artist:
-                            file_artist = artist
+def _folder_artist(scan_path, filepath):
+    """
+    Artist implied by where a file is stored: its top-level folder under
+    `scan_path`, or the folder below an index folder such as 'A-Z'.
+    """
+    parts = os.path.relpath(os.path.dirname(filepath), scan_path).split(os.sep)
+    if parts[0] in (os.curdir, os.pardir):
+        return None
+    if len(parts) > 1 and _is_bucket_folder(parts[0]):
+        return parts[1]
+    return parts[0]
+
+@profiled("scan.index_library")
+def _index_library(scan_path, cache=None, executor=None, max_pending=1, fingerprints=None):
+    """
+    Walks the whole library once and returns (filepath, artist, title) for
+    every audio file. Missing tags are filled in from the file name and folder,
+    or the file is handed to `fingerprints` when a FingerprintTier is given.
+    """
+    from tqdm import tqdm
 
-                        if not title or title in found_titles:
-                            file_pbar.update(1)
-                            continue
+    normalized_scan_path = os.path.normpath(scan_path)
+    local_files = []
+    seen_paths = set()
+    entries = timed_iter("scan.walk", iter_audio_files(normalized_scan_path))
+    metadata = timed_iter("scan.next_file", _iter_audio_metadata(entries, cache, executor, max_pending))
+    for filepath, file_artist, title in tqdm(metadata, desc="Indexing local files", unit="file", ncols=100):
+        seen_paths.add(filepath)
+        if not title and fingerprints is not None:
+            fingerprints.submit_untagged(filepath, _folder_artist(normalized_scan_path, filepath))
+            continue
+        if not title:
+            file_artist, title = clean_filename(os.path.basename(filepath))
+        if not file_artist:
+            file_artist = _folder_artist(normalized_scan_path, filepath)
+        if title:
+            local_files.append((filepath, file_artist, title))
+    # The walk covered the whole library, so every cached file not seen is gone
+    if cache is not None:
+        cache.evict_missing(normalized_scan_path, seen_paths)
+    return local_files
+
+@profiled("scan.match_library")
+def _match_library(local_files, songs_to_find, matched_files=None):
+    """
+    Resolves the pending sheet rows in `songs_to_find` (SheetRow keyed by row
+    index) against an index of `local_files`. Exact normalized (artist, title)
+    keys are looked up first; the remaining rows are fuzzy matched against the
+    files whose titles share the most trigrams with theirs. Each file matches
+    at most one row. Matched rows are removed from `songs_to_find` and returned,
+    and (filepath, song) pairs are added to `matched_files`.
+    """
+    from src.matcher import SongMatcher, MATCH_THRESHOLD
+    from src.artist_index import TrigramIndex
+
+    # Normalized once per file and per row, then shared by every lookup below
+    file_keys = [(normalize(artist, "scan.files"), normalize(title, "scan.files")) for _, artist, title in local_files]
+    song_keys = {
+        song.index: (normalize(song.artist, "scan.songs"), normalize(song.title, "scan.songs"))
+        for song in songs_to_find.values()
+    }
+    exact_keys = {}  # (artist, title) -> file numbers
+    title_files = {}  # title -> file numbers
+    for number, key in enumerate(file_keys):
+        exact_keys.setdefault(key, []).append(number)
+        title_files.setdefault(key[1], []).append(number)
 
-                        # Only try to match against songs for this artist
-                        matched_song, score, song_index = find_match_in_sheet(file_artist, title, songs_needed)
-
-                        if score > 85:
-                            file_pbar.write(f"Match found! (Score: {int(score)}%) - File: '{file}' matched to Sheet: '{matched_song.get('Title')}' by '{matched_song.get('Artist')}'")
-                            original_index = sheet_songs.index(matched_song)
-                            matches_to_update.append((original_index, matched_song))
-                            found_titles.add(title)
-                            # Remove from both songs_needed and songs_to_find
-                            songs_needed.pop(song_index)
-                            songs_to_find.remove(matched_song)
-                            # If all songs for this artist found, break
-                            if not songs_needed:
-                                break
-                        file_pbar.update(1)
-                    if not songs_needed:
-                        break
-                artist_pbar.update(1)
+    matches_to_update = []
+    claimed = set()
+
+    def claim(song, number, score):
+        claimed.add(number)
+        songs_to_find.pop(song.index, None)
+        matches_to_update.append(song)
+        if matched_files is not None:
+            matched_files.append((local_files[number][0], song))
+        print(f"Match found! (Score: {int(score)}%) - File: '{os.path.basename(local_files[number][0])}' matched to Sheet: '{song.title}' by '{song.artist}'")
+
+    for song in list(songs_to_find.values()):
+        for number in exact_keys.get(song_keys[song.index], ()):
+            if number not in claimed:
+                claim(song, number, 100)
+                break
+
+    title_index = TrigramIndex((title, title) for title in title_files)
+    for song in list(songs_to_find.values()):
+        song_artist, song_title = song_keys[song.index]
+        if not song_title:
+            continue
+        with timed("scan.match"):
+            candidates = [
+                number for title in title_index.candidates(song_title)
+                for number in title_files[title] if number not in claimed
+            ]
+            matcher = SongMatcher(
+                ((number, file_keys[number][1], file_keys[number][0]) for number in candidates), normalized=True
+            )
+            number, score = matcher.best_match(song_artist, song_title, normalized=True)
+        if score > MATCH_THRESHOLD:
+            claim(song, number, score)
     return matches_to_update
 
-def _update_sheet(sheet, matches_to_update, acquirement_col_index, triaged_col_index, mode):
+@profiled("scan.match_fingerprints")
+def _match_fingerprinted(fingerprints, songs_to_find, matched_files, persist=True):
+    """
+    Matches the untagged files collected by `fingerprints` once the scan is done.
+    Files matched earlier become references first. An untagged file identified
+    as a reference recording only matches a pending row with exactly that
+    artist and title; unidentified files fall back to their file names.
+    References are songs that are already acquired, so an identified file is
+    mostly a copy of one; it only fills a pending row that repeats that song.
+    """
+    if not fingerprints.untagged:
+        # Nothing to identify, so matched files are not worth fingerprinting
+        return []
+    for filepath, song in matched_files:
+        fingerprints.submit_reference(filepath, song.artist, song.title)
+    fingerprints.store_references(persist)
+
+    pending_keys = {}
+    for song in songs_to_find.values():
+        pending_keys.setdefault((normalize(song.artist, "scan.songs"), normalize(song.title, "scan.songs")), song)
+
+    matches_to_update = []
+    local_files = []
+    first_new_match = len(matched_files)
+    for filepath, fallback_artist, identity in fingerprints.resolve_untagged():
+        if identity is not None:
+            song = pending_keys.pop((normalize(identity[0], "scan.fingerprints"), normalize(identity[1], "scan.fingerprints")), None)
+            if song is not None and song.index in songs_to_find:
+                songs_to_find.pop(song.index)
+                matches_to_update.append(song)
+                matched_files.append((filepath, song))
+                print(f"Fingerprint match! - File: '{os.path.basename(filepath)}' matched to Sheet: '{song.title}' by '{song.artist}'")
+            # Otherwise a copy of a song that is already acquired; its file name is no use
+            continue
+        file_artist, title = clean_filename(os.path.basename(filepath))
+        if title:
+            local_files.append((filepath, file_artist or fallback_artist, title))
+    matches_to_update += _match_library(local_files, songs_to_find, matched_files)
+    # Untagged files matched here are fingerprinted already, so they become references at no extra cost
+    for filepath, song in matched_files[first_new_match:]:
+        fingerprints.submit_reference(filepath, song.artist, song.title)
+    fingerprints.store_references(persist)
+    print(f"Fingerprints: {fingerprints.identified} untagged files identified from {len(fingerprints.index)} references.")
+    return matches_to_update
+
+@profiled("scan.update_sheet")
+def _update_sheet(sheet, matches_to_update, acquirement_col_index, triaged_col_index, mode, batch_size=DEFAULT_BATCH_SIZE,
+                  local_store=DEFAULT_LOCAL_STORE, checkpoint=None):
+    """
+    Marks the matched rows as acquired and triaged in update mode, or lists them in scan mode.
+    Rows `checkpoint` records as written are skipped, and progress is recorded in it.
+    Returns False if the Google Sheet could not be updated.
+    """
     if not matches_to_update:
         print("No new matches found in the local library.")
-        return
+        return True
 
     print(f"-- Scan Complete ---\nFound {len(matches_to_update)} new songs to update.")
 
     if mode == 'scan':
         print("[Scan Mode] The following changes would be made in 'update' mode:")
-        for _, song in matches_to_update:
-            print(f"  - Mark '{song['Title']}' by '{song['Artist']}' as acquired and triaged.")
+        for song in matches_to_update:
+            print(f"  - Mark '{song.title}' by '{song.artist}' as acquired and triaged.")
     
     elif mode == 'update':
-        print("[Update Mode] Applying changes to Google Sheet and Excel file...")
-        for original_index, song in matches_to_update:
-            try:
-                row_to_update_index = original_index + 5 # Data starts on row 5
-                sheet.update_cell(row_to_update_index, acquirement_col_index + 1, 'acquired')
-                sheet.update_cell(row_to_update_index, triaged_col_index + 1, 'triaged')
-                update_excel_row(song['Title'], song['Artist'], {'Acquirement Status': 'acquired', 'Triaged': 'triaged'})
-                print(f"  - Updated '{song['Title']}'")
-            except Exception as e:
-                print(f"  - Failed to update '{song['Title']}'. Reason: {e}")
-    
+        print(f"[Update Mode] Applying changes to Google Sheet and local {local_store} store...")
+        sheet_songs = [song for song in matches_to_update if checkpoint is None or not checkpoint.sheet_applied(song)]
+        writer = SheetWriteBuffer(sheet, batch_size)
+        # Two cells per row, so each request covers `batch_size` cells and is recorded once it is sent
+        rows_per_request = max(1, int(batch_size) // 2)
+        try:
+            for start in range(0, len(sheet_songs), rows_per_request):
+                chunk = sheet_songs[start:start + rows_per_request]
+                for song in chunk:
+                    writer.update_cell(song.sheet_row, acquirement_col_index + 1, 'acquired')
+                    writer.update_cell(song.sheet_row, triaged_col_index + 1, 'triaged')
+                writer.flush()
+                if checkpoint is not None:
+                    checkpoint.mark_sheet_applied(chunk)
+            print(f"  - Updated {len(sheet_songs)} rows in Google Sheet.")
+        except Exception as e:
+            print(f"  - Failed to update Google Sheet. Reason: {e}")
+            return False
+        store_songs = [song for song in matches_to_update if checkpoint is None or not checkpoint.store_applied(song)]
+        updated = []
+        with open_local_store(local_store) as store:
+            for song in store_songs:
+                try:
+                    if store.update_row(song.title, song.artist, {'Acquirement Status': 'acquired', 'Triaged': 'triaged'}):
+                        print(f"  - Updated '{song.title}'")
+                    # A row missing from the store will not turn up on a retry either
+                    updated.append(song)
+                except Exception as e:
+                    print(f"  - Failed to update '{song.title}'. Reason: {e}")
+        # The store is only written when it closes
+        if checkpoint is not None:
+            checkpoint.mark_store_applied(updated)
+
     print("Update process complete.")
+    return True
+
+def _read_pending_songs(sheet):
+    """
+    Reads the sheet and returns (acquirement column index, triaged column index,
+    songs to find), where songs to find are the SheetRows not yet acquired or
+    triaged, keyed by row index. Returns None if the sheet cannot be read.
+    """
+    try:
+        with timed("scan.read_sheet"):
+            # Fetch all data, including headers on row 4
+            all_values = sheet.get_all_values()
+            headers = all_values[3] # Headers are on the 4th row (index 3)
+            sheet_songs_data = all_values[4:] # Data starts on the 5th row (index 4)
+
+            # Get column indices
+            acquirement_col_index = headers.index('Acquirement Status')
+            triaged_col_index = headers.index('Triaged')
+            sheet_songs = parseSheetRows(headers, sheet_songs_data)
+
+    except (ValueError, IndexError) as e:
+        print(f"Error: Could not find required columns or data in Google Sheet. Details: {e}")
+        return None
+
+    # Filter out songs that are already acquired and triaged, keyed by row index
+    songs_to_find = {
+        song.index: song for song in sheet_songs
+        if 'acquired' not in song.acquirement_status.lower() and \
+           'triaged' not in song.triaged.lower()
+    }
+    return acquirement_col_index, triaged_col_index, songs_to_find
+
+def _find_matches(scan_path, songs_to_find, checkpoint, mode, rebuild_cache, workers, strategy, fingerprint, fingerprint_seconds):
+    """Runs the scan strategy and the fingerprint tier, and returns the matched rows."""
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    fingerprints = None
+    matched_files = checkpoint.matched_files
+    try:
+        with MetadataCache() as cache:
+            if rebuild_cache:
+                print("Rebuilding the local metadata cache...")
+                cache.clear()
+            if fingerprint:
+                fingerprints = FingerprintTier(cache, fingerprint_seconds, workers)
+            if strategy == 'library':
+                local_files = _index_library(scan_path, cache, executor, PENDING_PER_WORKER * workers, fingerprints)
+                print(f"Indexed {len(local_files)} local files.")
+                matches_to_update = _match_library(local_files, songs_to_find, matched_files)
+            else:
+                matches_to_update = _scan_files(scan_path, songs_to_find, cache, executor, PENDING_PER_WORKER * workers,
+                                                fingerprints, matched_files, checkpoint)
+            if fingerprints is not None:
+                # References are only remembered for matches that update mode records as acquired
+                matches_to_update += _match_fingerprinted(fingerprints, songs_to_find, matched_files, persist=mode == 'update')
+            print(f"Metadata cache: {cache.hits} hits, {cache.misses} misses.")
+    finally:
+        if fingerprints is not None:
+            fingerprints.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return matches_to_update
 
-def scan_music_library(sheet, scan_path, mode):
+def scan_music_library(sheet, scan_path, mode, batch_size=DEFAULT_BATCH_SIZE, rebuild_cache=False, workers=DEFAULT_WORKERS,
+                       local_store=DEFAULT_LOCAL_STORE, strategy=DEFAULT_SCAN_STRATEGY, fingerprint=False, fingerprint_seconds=FINGERPRINT_SECONDS,
+                       resume=False):
     """
     Scans a local music library, compares it with the Google Sheet,
     and updates the sheet and Excel file based on the findings.
+    Progress is checkpointed; with `resume`, an interrupted scan continues
+    where it stopped and only the updates not yet applied are sent.
     """
     if not os.path.exists(scan_path):
         print(f"Error: Scan path does not exist: {scan_path}")
         return
 
     print("Reading data from Google Sheet...")
-    try:
-        # Fetch all data, including headers on row 4
-        all_values = sheet.get_all_values()
-        headers = all_values[3] # Headers are on the 4th row (index 3)
-        sheet_songs_data = all_values[4:] # Data starts on the 5th row (index 4)
-
-        # Get column indices
-        title_col_index = headers.index('Title')
-        artist_col_index = headers.index('Artist')
-        acquirement_col_index = headers.index('Acquirement Status')
-        triaged_col_index = headers.index('Triaged')
-
-    except (ValueError, IndexError) as e:
-        print(f"Error: Could not find required columns or data in Google Sheet. Details: {e}")
+    pending = _read_pending_songs(sheet)
+    if pending is None:
         return
+    acquirement_col_index, triaged_col_index, songs_to_find = pending
 
-    # Create a list of dictionaries manually for easier processing
-    sheet_songs = [dict(zip(headers, row)) for row in sheet_songs_data]
-
-    # Filter out songs that are already acquired and triaged
-    songs_to_find = [
-        song for song in sheet_songs
-        if 'acquired' not in str(song.get('Acquirement Status', '')).lower() and \
-           'triaged' not in str(song.get('Triaged', '')).lower()
-    ]
+    checkpoint = ScanCheckpoint.open(os.path.normpath(scan_path), strategy, resume)
+    matches_to_update = checkpoint.restore(songs_to_find)
     print(f"Found {len(songs_to_find)} songs to search for locally.")
 
-    matches_to_update = _scan_files(scan_path, songs_to_find, sheet_songs)
-    _update_sheet(sheet, matches_to_update, acquirement_col_index, triaged_col_index, mode)
+    if fingerprint and not fpcalc_available():
+        print("Warning: fpcalc (Chromaprint) was not found on the PATH. Fingerprint matching is disabled.")
+        fingerprint = False
+
+    try:
+        if checkpoint.scan_complete:
+            print("The interrupted scan had finished; applying its remaining updates.")
+        else:
+            matches_to_update += _find_matches(scan_path, songs_to_find, checkpoint, mode, rebuild_cache, workers,
+                                               strategy, fingerprint, fingerprint_seconds)
+            checkpoint.scan_complete = True
+            checkpoint.save()
+        if _update_sheet(sheet, matches_to_update, acquirement_col_index, triaged_col_index, mode, batch_size,
+                         local_store, checkpoint):
+            checkpoint.clear()
+        else:
+            checkpoint.save()
+            print("Run the scan again with --resume to retry the remaining updates.")
+    except BaseException:
+        # Also on Ctrl+C: keep what was done so far for --resume
+        checkpoint.save()
+        print(f"Scan progress saved to {checkpoint.path}. Run the scan again with --resume to continue.")
+        raise
@@ -0,0 +1,309 @@
+# src/local_store.py
+
+"""
+Local copies of the Google Sheet. The Excel store works on song-list.xlsx
+directly; the SQLite store keeps the rows in an indexed database and treats
+the xlsx (and optionally a Parquet file) as export targets.
+"""
+
+import sqlite3
+from abc import ABC, abstractmethod
+from src.profiling import profiled
+from excel import (
+    EXCEL_FILE_NAME, ExcelSession, _padded, _row_key,
+    reset_excel_from_google_sheet, sync_excel_from_google_sheet,
+)
+
+SQLITE_FILE_NAME = "song-list.sqlite"
+PARQUET_FILE_NAME = "song-list.parquet"
+LOCAL_STORES = ('excel', 'sqlite')
+DEFAULT_LOCAL_STORE = 'excel'
+# Used by callers that only write to a worksheet, such as backup jobs for other worksheets
+NO_LOCAL_STORE = 'none'
+
+
+class LocalStore(ABC):
+    """
+    Interface shared by the local stores. Use as a context manager: changes
+    are kept in memory or in a transaction and written once on close.
+    """
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    @abstractmethod
+    def append_row(self, row_data):
+        """Appends a sheet row. Returns True if it was written."""
+
+    @abstractmethod
+    def update_row(self, song_title, artist, updates):
+        """Sets the `updates` columns of the row for the song. Returns True if it was updated."""
+
+    @abstractmethod
+    def reset(self, sheet):
+        """Replaces the store's contents with the Google Sheet."""
+
+    @abstractmethod
+    def sync(self, sheet):
+        """Brings the store in line with the Google Sheet."""
+
+
+class NullStore(LocalStore):
+    """Accepts and discards every change."""
+
+    def append_row(self, row_data):
+        return False
+
+    def update_row(self, song_title, artist, updates):
+        return False
+
+    def reset(self, sheet):
+        pass
+
+    def sync(self, sheet):
+        pass
+
+
+class ExcelStore(LocalStore):
+    """Keeps song-list.xlsx as the working copy, through one ExcelSession."""
+
+    def __init__(self, file_name=EXCEL_FILE_NAME):
+        self.file_name = file_name
+        self.session = None
+
+    def _session(self):
+        if self.session is None:
+            self.session = ExcelSession(self.file_name)
+            self.session.open()
+        return self.session
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def append_row(self, row_data):
+        return self._session().append_row(row_data)
+
+    def update_row(self, song_title, artist, updates):
+        return self._session().update_row(song_title, artist, updates)
+
+    def reset(self, sheet):
+        self.close()
+        reset_excel_from_google_sheet(sheet)
+
+    def sync(self, sheet):
+        self.close()
+        sync_excel_from_google_sheet(sheet)
+
+
+def _quote(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+# Columns of the songs table that do not come from the sheet
+RESERVED_COLUMNS = ("row_id", "title_key", "artist_key")
+
+
+def _column_names(headers):
+    """
+    Returns one unique column name per sheet header. Blank headers (gspread pads
+    the header row to the widest data row) become 'Column N', and repeated names
+    get ' (2)', ' (3)', ... SQLite compares column names case-insensitively.
+    """
+    names = []
+    used = set(RESERVED_COLUMNS)
+    for position, header in enumerate(headers, start=1):
+        base = str(header) if str(header).strip() else f"Column {position}"
+        name = base
+        copy = 1
+        while name.casefold() in used:
+            copy += 1
+            name = f"{base} ({copy})"
+        used.add(name.casefold())
+        names.append(name)
+    return names
+
+
+class SqliteStore(LocalStore):
+    """
+    Keeps the sheet rows in an SQLite table with one column per sheet header,
+    plus normalized title/artist keys. Title/artist keys and Spotify Link are indexed.
+    """
+
+    def __init__(self, file_name=SQLITE_FILE_NAME):
+        self.file_name = file_name
+        self.conn = None
+        self.headers = []
+        self.warned_empty = False
+
+    def open(self):
+        self.conn = sqlite3.connect(self.file_name)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS headers (position INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        self.headers = [name for (name,) in self.conn.execute("SELECT name FROM headers ORDER BY position")]
+
+    def _ready(self):
+        if self.conn is None:
+            return False
+        if not self.headers:
+            if not self.warned_empty:
+                print(f"{self.file_name} has no data yet. Please use --reset-excel first to create it.")
+                self.warned_empty = True
+            return False
+        return True
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def _create_table(self, headers):
+        headers = _column_names(headers)
+        self.conn.execute("DROP TABLE IF EXISTS songs")
+        self.conn.execute("DELETE FROM headers")
+        self.conn.executemany("INSERT INTO headers (position, name) VALUES (?, ?)", list(enumerate(headers)))
+        columns = ", ".join(f"{_quote(header)} TEXT" for header in headers)
+        self.conn.execute(
+            f"CREATE TABLE songs (row_id INTEGER PRIMARY KEY, title_key TEXT, artist_key TEXT, {columns})"
+        )
+        self.conn.execute("CREATE INDEX songs_title_artist ON songs (title_key, artist_key)")
+        if "Spotify Link" in headers:
+            self.conn.execute(f"CREATE INDEX songs_link ON songs ({_quote('Spotify Link')})")
+        self.headers = list(headers)
+
+    def _insert_rows(self, rows):
+        if not self.headers:
+            return 0
+        width = len(self.headers)
+        title_col = self.headers.index("Title") if "Title" in self.headers else None
+        artist_col = self.headers.index("Artist") if "Artist" in self.headers else None
+        columns = ", ".join(_quote(header) for header in self.headers)
+        placeholders = ", ".join("?" for _ in range(width + 2))
+
+        def records():
+            for row in rows:
+                values = list(_padded(row, width)) if len(row) < width else list(row[:width])
+                title = values[title_col] if title_col is not None else None
+                artist = values[artist_col] if artist_col is not None else None
+                yield _row_key(title, artist) + tuple(values)
+
+        cursor = self.conn.executemany(
+            f"INSERT INTO songs (title_key, artist_key, {columns}) VALUES ({placeholders})", records()
+        )
+        return cursor.rowcount
+
+    def append_row(self, row_data):
+        if not self._ready():
+            return False
+        self._insert_rows([row_data])
+        return True
+
+    def update_row(self, song_title, artist, updates):
+        if not self._ready():
+            return False
+        missing = [header for header in updates if header not in self.headers]
+        if missing:
+            print(f"Error: A required column is missing in {self.file_name} - {missing}")
+            return False
+
+        title_key, artist_key = _row_key(song_title, artist)
+        row_ids = [row_id for (row_id,) in self.conn.execute(
+            "SELECT row_id FROM songs WHERE title_key = ? AND artist_key = ?", (title_key, artist_key)
+        )]
+        if not row_ids:
+            print(f"Could not find row for '{song_title}' in {self.file_name} to update.")
+            return False
+        if len(row_ids) > 1:
+            print(f"Duplicate rows {row_ids} found for '{song_title}' by '{artist}' in {self.file_name}. Skipping update.")
+            return False
+
+        assignments = ", ".join(f"{_quote(header)} = ?" for header in updates)
+        self.conn.execute(f"UPDATE songs SET {assignments} WHERE row_id = ?", list(updates.values()) + row_ids)
+        return True
+
+    @profiled("sqlite.reset")
+    def reset(self, sheet):
+        print(f"Resetting {self.file_name} from Google Sheet...")
+        previous_headers = self.headers
+        try:
+            all_values = sheet.get_all_values()
+            if len(all_values) < 4:
+                print("Google Sheet has fewer than 4 rows. Cannot determine headers.")
+                return
+            # The reset runs in a transaction of its own, so earlier changes are committed first
+            self.conn.commit()
+            # sqlite3 does not open a transaction before DDL, so DROP TABLE would commit at once.
+            # An explicit BEGIN keeps the old table in place if anything below fails
+            with self.conn:
+                self.conn.execute("BEGIN")
+                self._create_table(all_values[3])
+                count = self._insert_rows(all_values[4:])
+        except Exception as e:
+            self.headers = previous_headers
+            print(f"An error occurred during SQLite reset: {e}")
+            return
+        print(f"Successfully reset {self.file_name} with {count} rows.")
+
+    def sync(self, sheet):
+        # Rebuilding the table is a single bulk insert, so it is as cheap as a diff here
+        self.reset(sheet)
+
+    def iter_rows(self):
+        """Yields the header row, then every data row in sheet order."""
+        yield list(self.headers)
+        columns = ", ".join(_quote(header) for header in self.headers)
+        for row in self.conn.execute(f"SELECT {columns} FROM songs ORDER BY row_id"):
+            yield ['' if value is None else value for value in row]
+
+    @profiled("sqlite.export_excel")
+    def export_excel(self, file_name=EXCEL_FILE_NAME):
+        """Writes the rows to an xlsx file with a streaming write-only workbook."""
+        if not self.headers:
+            return
+        import openpyxl
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Music Saved Tracks")
+        for row in self.iter_rows():
+            ws.append(row)
+        wb.save(file_name)
+        print(f"Exported {self.file_name} to {file_name}.")
+
+    def export_parquet(self, file_name=PARQUET_FILE_NAME):
+        """Writes the rows to a Parquet file. Requires the optional pyarrow package."""
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            print("Parquet export requires pyarrow. Install it with: pip install pyarrow")
+            return
+        if not self.headers:
+            return
+        rows = self.iter_rows()
+        next(rows)
+        columns = list(zip(*rows)) or [[] for _ in self.headers]
+        table = pyarrow.table({header: [str(value) for value in column] for header, column in zip(self.headers, columns)})
+        pyarrow.parquet.write_table(table, file_name)
+        print(f"Exported {self.file_name} to {file_name}.")
+
+
+def open_local_store(backend=DEFAULT_LOCAL_STORE):
+    """Returns an unopened store for `backend` ('excel', 'sqlite' or 'none'); use it in a with block."""
+    if backend == 'sqlite':
+        return SqliteStore()
+    if backend == NO_LOCAL_STORE:
+        return NullStore()
+    if backend not in (None, 'excel'):
+        print(f"Unknown local store '{backend}', using Excel.")
+    return ExcelStore()
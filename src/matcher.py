@@ -0,0 +1,87 @@
+# src/matcher.py
+
+from rapidfuzz import fuzz, process
+from src.normalize import normalize
+
+# A local file matches a sheet song when its weighted score is above this
+MATCH_THRESHOLD = 85
+TITLE_WEIGHT = 0.7
+ARTIST_WEIGHT = 0.3
+# Artist score used when a local file has no artist
+MISSING_ARTIST_SCORE = 50
+
+
+class SongMatcher:
+    """
+    Fuzzy matches local files against a fixed set of sheet songs.
+    Titles and artists are normalized once up front; each lookup scores a file
+    against every remaining candidate in a single rapidfuzz call, skipping
+    candidates whose title cannot reach the threshold. Pass `normalized=True`
+    when the titles and artists given were already put through normalize().
+    """
+
+    def __init__(self, songs=(), normalized=False):
+        self.titles = {}
+        self.artists = {}
+        for key, title, artist in songs:
+            self.add(key, title, artist, normalized)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def add(self, key, sheet_title, sheet_artist, normalized=False):
+        if not sheet_title or not sheet_artist:
+            return
+        if not normalized:
+            sheet_title = normalize(sheet_title, "match.candidates")
+            sheet_artist = normalize(sheet_artist, "match.candidates")
+        self.titles[key] = sheet_title
+        self.artists[key] = sheet_artist
+
+    def remove(self, key):
+        self.titles.pop(key, None)
+        self.artists.pop(key, None)
+
+    def best_match(self, local_artist, local_title, threshold=MATCH_THRESHOLD, normalized=False):
+        """
+        Returns (key, score) for the highest scoring candidate whose score
+        is above `threshold`, or (None, 0) if there is none.
+        Scores use the same 0.7 title / 0.3 artist weighting as fuzz.ratio did.
+        """
+        if not local_title or not self.titles:
+            return None, 0
+
+        if normalized:
+            artist, title = local_artist or '', local_title
+        else:
+            artist = normalize(local_artist, "match.queries")
+            title = normalize(local_title, "match.queries")
+        best_artist_score = 100 if artist else MISSING_ARTIST_SCORE
+        # Lowest title score that could still beat the threshold with the best possible artist score
+        title_cutoff = max(0, (threshold - best_artist_score * ARTIST_WEIGHT) / TITLE_WEIGHT - 1)
+
+        title_scores = process.extract(
+            title, self.titles, scorer=fuzz.ratio,
+            limit=None, score_cutoff=title_cutoff,
+        )
+        if not title_scores:
+            return None, 0
+
+        artist_scores = {}
+        best = (None, 0)
+        for _, title_score, key in title_scores:
+            if artist:
+                candidate_artist = self.artists[key]
+                if candidate_artist not in artist_scores:
+                    artist_scores[candidate_artist] = round(fuzz.ratio(artist, candidate_artist))
+                artist_score = artist_scores[candidate_artist]
+            else:
+                artist_score = MISSING_ARTIST_SCORE
+            score = round(title_score) * TITLE_WEIGHT + artist_score * ARTIST_WEIGHT
+            if score > best[1]:
+                best = (key, score)
+
+        key, score = best
+        if key is None or score <= threshold:
+            return None, 0
+        return key, score
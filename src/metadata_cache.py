@@ -0,0 +1,131 @@
+# src/metadata_cache.py
+
+import os
+import sqlite3
+from src.fingerprint import pack_fingerprint, unpack_fingerprint
+
+METADATA_CACHE_FILE = ".metadata_cache.sqlite"
+# Number of writes between commits, so an interrupted scan keeps most of its work
+COMMIT_EVERY = 1000
+
+
+class MetadataCache:
+    """
+    On-disk cache of extracted (artist, title) tags keyed by file path.
+    An entry is only used while the file's size and modification time are unchanged.
+    """
+
+    def __init__(self, path=METADATA_CACHE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " artist TEXT,"
+            " title TEXT)"
+        )
+        # Fingerprints of the first `seconds` of a file; artist/title are set once the file matched a sheet song
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " seconds INTEGER NOT NULL,"
+            " fingerprint BLOB,"
+            " artist TEXT,"
+            " title TEXT)"
+        )
+        self.pending_writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def get(self, path, stat):
+        """Returns (hit, artist, title) for `path` given its current os.stat() result."""
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, artist, title FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            self.hits += 1
+            return True, row[2], row[3]
+        self.misses += 1
+        return False, None, None
+
+    def put(self, path, stat, artist, title):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, artist, title) VALUES (?, ?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, artist, title),
+        )
+        self.pending_writes += 1
+        if self.pending_writes >= COMMIT_EVERY:
+            self.commit()
+
+    def get_fingerprint(self, path, stat, seconds):
+        """Returns (hit, fingerprint) for `path`; the fingerprint is None if fpcalc could not read the file."""
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, seconds, fingerprint FROM fingerprints WHERE path = ?", (path,)
+        ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns and row[2] == seconds:
+            return True, unpack_fingerprint(row[3]) if row[3] is not None else None
+        return False, None
+
+    def put_fingerprint(self, path, stat, seconds, fingerprint):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, seconds, fingerprint) VALUES (?, ?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, seconds, pack_fingerprint(fingerprint) if fingerprint else None),
+        )
+        self.pending_writes += 1
+        if self.pending_writes >= COMMIT_EVERY:
+            self.commit()
+
+    def set_fingerprint_identity(self, path, artist, title):
+        """Records the sheet song a fingerprinted file matched, making it a reference for later scans."""
+        self.conn.execute("UPDATE fingerprints SET artist = ?, title = ? WHERE path = ?", (artist, title, path))
+        self.pending_writes += 1
+
+    def fingerprint_references(self, seconds):
+        """Yields (path, fingerprint, artist, title) for every fingerprint with a known song."""
+        rows = self.conn.execute(
+            "SELECT path, fingerprint, artist, title FROM fingerprints"
+            " WHERE seconds = ? AND fingerprint IS NOT NULL AND title IS NOT NULL", (seconds,)
+        )
+        for path, fingerprint, artist, title in rows.fetchall():
+            yield path, unpack_fingerprint(fingerprint), artist, title
+
+    def evict_missing(self, folder, seen_paths):
+        """Removes entries under `folder` that were not seen by a complete walk of it."""
+        prefix = os.path.join(folder, '')
+        # Range query on the primary key instead of LIKE, which would need escaping
+        rows = self.conn.execute(
+            "SELECT path FROM files WHERE path >= ? AND path < ?", (prefix, prefix + '\U0010ffff')
+        ).fetchall()
+        stale = [(path,) for (path,) in rows if path not in seen_paths]
+        if stale:
+            self.conn.executemany("DELETE FROM files WHERE path = ?", stale)
+            # Reference fingerprints stay: they still identify copies of the same recording
+            self.conn.executemany("DELETE FROM fingerprints WHERE path = ? AND title IS NULL", stale)
+            self.pending_writes += len(stale)
+        return len(stale)
+
+    def clear(self):
+        self.conn.execute("DELETE FROM files")
+        self.conn.execute("DELETE FROM fingerprints WHERE title IS NULL")
+        self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending_writes = 0
+
+    def close(self):
+        if self.conn is not None:
+            self.commit()
+            self.conn.close()
+            self.conn = None
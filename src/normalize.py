@@ -0,0 +1,104 @@
+# src/normalize.py
+
+"""
+Normalization of titles, artists and folder names for matching. Text is
+transliterated to ASCII, casefolded and stripped of release noise such as
+"(Remastered 2011)", "feat. X" or "[Explicit]". The same names come up again
+and again during a scan, so results are kept in a bounded LRU cache, and
+cache hits are counted per stage ("<area>.<step>", as in src/profiling.py).
+"""
+
+import re
+import functools
+
+# Distinct strings remembered; a scan normalizes a few strings per sheet row and file
+CACHE_SIZE = 1 << 16
+DEFAULT_STAGE = "other"
+
+# Words of release notes that do not change which song a title refers to, plus years.
+# A note is only dropped when every word in it is one of these, so "(Live)", "(Acoustic)"
+# or "(Clean Bandit Remix)" are kept.
+_NOISE_WORD = re.compile(
+    r"remaster\w*|explicit|radio|edit|single|album|version|bonus|track|deluxe|edition|expanded|(?:19|20)\d\d"
+    r"|official|audio|video|lyrics?|hq|hd|\d+kbps"
+)
+# A credit at the end of a note, e.g. "feat. X" in "(Remastered 2011 feat. X)" or "(with X)"
+_NOTE_CREDIT = re.compile(r"(?:^|\s)(?:feat|ft|featuring|with)\b.*$")
+# Square-bracketed notes, e.g. "[Explicit]" or "[320kbps]"
+_BRACKETED = re.compile(r"\[([^\[\]]*)\]")
+# Parenthesized notes, e.g. "(Remastered 2011)", "(feat. X)" or "(with X)"
+_PARENTHESIZED = re.compile(r"\(([^()]*)\)")
+# Notes after a dash, e.g. " - Remastered 2011" or " - Radio Edit"
+_DASH_SUFFIX = re.compile(r"\s-\s([^-]*)$")
+# Unbracketed credits run to the end, e.g. "Title feat. X". "Feat" alone is left
+# alone so names such as "Little Feat" survive.
+_CREDIT = re.compile(r"\s(?:feat\.|ft\.|featuring\s).*$")
+
+
+def _is_noise(note):
+    """True if `note` (the text of a bracketed, parenthesized or dash note) is only credits and release noise."""
+    words = re.findall(r"[a-z0-9]+", _NOTE_CREDIT.sub("", note))
+    return all(_NOISE_WORD.fullmatch(word) for word in words)
+
+
+def _drop_noise(match):
+    return " " if _is_noise(match.group(1)) else match.group(0)
+
+# Stage -> [hits, misses]
+_counts = {}
+_misses = 0
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _normalize(text):
+    from unidecode import unidecode
+
+    global _misses
+    _misses += 1
+    folded = unidecode(text).casefold()
+    stripped = _BRACKETED.sub(_drop_noise, folded)
+    stripped = _PARENTHESIZED.sub(_drop_noise, stripped)
+    stripped = _DASH_SUFFIX.sub(_drop_noise, stripped)
+    stripped = _CREDIT.sub("", stripped)
+    # A name that is nothing but noise, e.g. "[Explicit]", is kept as it was
+    return " ".join(stripped.split()) or " ".join(folded.split())
+
+
+def normalize(text, stage=DEFAULT_STAGE):
+    """Returns `text` transliterated, casefolded and without release noise, for comparison."""
+    if not text:
+        return ''
+    misses = _misses
+    result = _normalize(text)
+    # Counts are approximate if several threads normalize at once; matching runs on one thread
+    counts = _counts.get(stage)
+    if counts is None:
+        counts = _counts[stage] = [0, 0]
+    counts[_misses != misses] += 1
+    return result
+
+
+def hit_rates():
+    """Returns {stage: {'calls', 'hits', 'hit_rate'}} for the normalizations since the last reset."""
+    return {
+        stage: {'calls': hits + misses, 'hits': hits, 'hit_rate': hits / (hits + misses)}
+        for stage, (hits, misses) in _counts.items() if hits + misses
+    }
+
+
+def print_hit_rates():
+    rates = hit_rates()
+    if not rates:
+        return
+    print("--- Normalization cache ---")
+    print(f"{'stage':<28}{'calls':>9}{'hits':>9}{'hit %':>8}")
+    for stage, rate in sorted(rates.items()):
+        print(f"{stage:<28}{rate['calls']:>9}{rate['hits']:>9}{rate['hit_rate'] * 100:>8.1f}")
+
+
+def reset():
+    """Clears the counters and the cache."""
+    global _misses
+    _counts.clear()
+    _misses = 0
+    _normalize.cache_clear()
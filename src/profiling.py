@@ -0,0 +1,159 @@
+# src/profiling.py
+
+"""
+Lightweight timers for the hot paths of a run. Timing is off by default and
+every helper is close to free until enable() is called (main.py does this
+for --profile). Stages are named "<area>.<step>", e.g. "scan.read_tags".
+"""
+
+import json
+import math
+import time
+import threading
+import functools
+from datetime import datetime, timezone
+
+_enabled = False
+_lock = threading.Lock()
+# Stage name -> list of durations in seconds
+_timings = {}
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+
+
+def record(stage, seconds):
+    with _lock:
+        _timings.setdefault(stage, []).append(seconds)
+
+
+class _Timer:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(stage):
+    """Context manager that records how long its block took under `stage`."""
+    return _Timer(stage) if _enabled else _NULL_TIMER
+
+
+def profiled(stage):
+    """Decorator that records every call of the function under `stage`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def timed_iter(stage, iterable):
+    """Yields from `iterable`, recording the time spent producing each item under `stage`."""
+    if not _enabled:
+        return iterable
+    return _timed_iter(stage, iter(iterable))
+
+
+def _timed_iter(stage, iterator):
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            record(stage, time.perf_counter() - start)
+            yield item
+    finally:
+        # Pass an early close on to a wrapped generator
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+
+
+def _percentile(sorted_values, fraction):
+    # Nearest-rank percentile
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summary():
+    """Returns {stage: {'calls', 'total', 'p50', 'p95', 'max'}} with times in seconds."""
+    with _lock:
+        timings = {stage: sorted(values) for stage, values in _timings.items()}
+    return {
+        stage: {
+            'calls': len(values),
+            'total': sum(values),
+            'p50': _percentile(values, 0.50),
+            'p95': _percentile(values, 0.95),
+            'max': values[-1],
+        }
+        for stage, values in timings.items() if values
+    }
+
+
+def print_report():
+    stats = summary()
+    if not stats:
+        print("Profile: no timed stages ran.")
+        return
+    print("--- Profile ---")
+    print(f"{'stage':<28}{'calls':>9}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for stage, stat in sorted(stats.items(), key=lambda item: item[1]['total'], reverse=True):
+        print(f"{stage:<28}{stat['calls']:>9}{stat['total']:>10.3f}"
+              f"{stat['p50'] * 1000:>10.2f}{stat['p95'] * 1000:>10.2f}{stat['max'] * 1000:>10.2f}")
+
+
+def write_json(path, **extra):
+    """
+    Appends this run's summary as one JSON line to `path`, so repeated
+    (e.g. cron) runs build up a history that can be compared over time.
+    """
+    entry = {'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'), **extra, 'stages': summary()}
+    try:
+        with open(path, 'a') as file:
+            file.write(json.dumps(entry) + '\n')
+        print(f"Profile appended to {path}.")
+    except OSError as e:
+        print(f"Could not write profile to {path}: {e}")
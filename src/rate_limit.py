@@ -0,0 +1,38 @@
+# src/rate_limit.py
+
+import time
+import threading
+from src.profiling import timed
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread calling one API. Up to `burst` requests
+    go out at once; after that, callers are given slots `1 / per_second` apart
+    and sleep until theirs comes up. Time spent waiting is recorded under `stage`.
+    """
+
+    def __init__(self, per_second, burst=1, stage="rate_limit"):
+        self.interval = 1 / per_second
+        self.burst = burst
+        self.stage = stage
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Refills the bucket, as if no request had been made yet."""
+        with self.lock:
+            self.tokens = self.burst
+            self.updated = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+            self.updated = now
+            # A negative balance reserves a slot for this caller after the callers already waiting
+            self.tokens -= 1
+            delay = -self.tokens * self.interval if self.tokens < 0 else 0
+        if delay:
+            with timed(self.stage):
+                time.sleep(delay)
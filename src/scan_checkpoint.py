@@ -0,0 +1,163 @@
+# src/scan_checkpoint.py
+
+"""
+Progress of a --scan-local run, kept in .scan_checkpoint.json so an
+interrupted scan can be continued with --resume. It records the artist
+folders already walked, the matches found so far, and which of those were
+already written to the Google Sheet and to the local store.
+"""
+
+import os
+import json
+import time
+from src.song import SheetRow
+
+SCAN_CHECKPOINT_FILE = ".scan_checkpoint.json"
+CHECKPOINT_VERSION = 1
+# Minimum seconds between checkpoint writes while a scan is running
+SAVE_INTERVAL_SECONDS = 30
+
+
+def _song_key(song):
+    # Row position plus identity, so a different song that moved into the same row is not confused with it
+    return song.index, song.title, song.artist
+
+
+class ScanCheckpoint:
+    """
+    Matches are kept in `matched_files`, a list of (filepath, SheetRow) that
+    the scan appends to as it goes. Everything is written on save(); call
+    maybe_save() from loops, and clear() once the scan and its updates are done.
+    """
+
+    def __init__(self, scan_path, strategy, path=SCAN_CHECKPOINT_FILE):
+        self.path = path
+        self.scan_path = scan_path
+        self.strategy = strategy
+        self.scan_complete = False
+        self.done_folders = set()
+        self.matched_files = []
+        self.applied_sheet = set()  # _song_key of rows written to the Google Sheet
+        self.applied_store = set()  # _song_key of rows written to the local store
+        self.saved_at = time.monotonic()
+
+    @classmethod
+    def open(cls, scan_path, strategy, resume=False, path=SCAN_CHECKPOINT_FILE):
+        """Returns the saved checkpoint of the same scan when `resume` is set, and a new one otherwise."""
+        checkpoint = cls(scan_path, strategy, path)
+        if not os.path.exists(path):
+            if resume:
+                print("No interrupted scan to resume. Starting a new scan.")
+            return checkpoint
+        if not resume:
+            print(f"Found {path} from an interrupted scan. Starting over; use --resume to continue it instead.")
+            return checkpoint
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Could not read {path}, starting a new scan: {e}")
+            return checkpoint
+        if data.get("version") != CHECKPOINT_VERSION or data.get("scan_path") != scan_path or data.get("strategy") != strategy:
+            print(f"{path} is from a different scan (path or --scan-strategy). Starting a new scan.")
+            return checkpoint
+
+        checkpoint.scan_complete = data.get("scan_complete", False)
+        checkpoint.done_folders = set(data.get("done_folders", []))
+        for match in data.get("matches", []):
+            song = SheetRow(match["index"], match["title"], match["artist"], '', '')
+            checkpoint.matched_files.append((match["file"], song))
+            if match.get("sheet"):
+                checkpoint.applied_sheet.add(_song_key(song))
+            if match.get("store"):
+                checkpoint.applied_store.add(_song_key(song))
+        print(f"Resuming the interrupted scan: {len(checkpoint.done_folders)} folders done, "
+              f"{len(checkpoint.matched_files)} matches found.")
+        return checkpoint
+
+    def restore(self, songs_to_find):
+        """
+        Checks the saved matches against freshly read pending rows and returns
+        the songs that still need an update. A match only keeps its row when
+        that row still holds the same title and artist; a row that moved is
+        found again by title and artist. Matches whose row is no longer
+        pending were already written to the sheet (e.g. just before the
+        interruption), so only their local store update is left, if any.
+        """
+        by_identity = {}
+        for song in songs_to_find.values():
+            by_identity.setdefault((song.title, song.artist), song)
+
+        restored = []
+        matched_files = []
+        for filepath, saved in self.matched_files:
+            current = songs_to_find.get(saved.index)
+            if current is None or (current.title, current.artist) != (saved.title, saved.artist):
+                current = by_identity.get((saved.title, saved.artist))
+            if current is not None and current.index in songs_to_find:
+                # Still pending in the sheet, whatever was recorded, so write it (again)
+                songs_to_find.pop(current.index)
+                self.applied_sheet.discard(_song_key(saved))
+                if _song_key(saved) in self.applied_store:
+                    self.applied_store.discard(_song_key(saved))
+                    self.applied_store.add(_song_key(current))
+                matched_files.append((filepath, current))
+                restored.append(current)
+                continue
+            self.applied_sheet.add(_song_key(saved))
+            matched_files.append((filepath, saved))
+            if _song_key(saved) not in self.applied_store:
+                restored.append(saved)
+        self.matched_files = matched_files
+        return restored
+
+    def sheet_applied(self, song):
+        return _song_key(song) in self.applied_sheet
+
+    def store_applied(self, song):
+        return _song_key(song) in self.applied_store
+
+    def mark_sheet_applied(self, songs):
+        self.applied_sheet.update(_song_key(song) for song in songs)
+        self.maybe_save()
+
+    def mark_store_applied(self, songs):
+        self.applied_store.update(_song_key(song) for song in songs)
+        self.save()
+
+    def folder_done(self, folder):
+        self.done_folders.add(folder)
+        self.maybe_save()
+
+    def maybe_save(self):
+        if time.monotonic() - self.saved_at >= SAVE_INTERVAL_SECONDS:
+            self.save()
+
+    def save(self):
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "scan_path": self.scan_path,
+            "strategy": self.strategy,
+            "scan_complete": self.scan_complete,
+            "done_folders": sorted(self.done_folders),
+            "matches": [
+                {
+                    "file": filepath, "index": song.index, "title": song.title, "artist": song.artist,
+                    "sheet": self.sheet_applied(song), "store": self.store_applied(song),
+                }
+                for filepath, song in self.matched_files
+            ],
+        }
+        # Written to a temporary file first, so an interruption never leaves half a checkpoint
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save scan checkpoint {self.path}: {e}")
+        self.saved_at = time.monotonic()
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
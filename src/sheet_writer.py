@@ -0,0 +1,91 @@
+# src/sheet_writer.py
+
+import time
+from src.profiling import timed
+from src.rate_limit import RateLimiter
+
+# Maximum number of rows (appends) or ranges (cell updates) sent in one request
+DEFAULT_BATCH_SIZE = 500
+# Retry policy for rate-limited (HTTP 429) requests
+MAX_RETRIES = 5
+INITIAL_BACKOFF_SECONDS = 2
+# Google Sheets allows 60 requests per minute per user, and every job shares the one service account
+SHEETS_REQUESTS_PER_MINUTE = 60
+SHEETS_RATE_LIMITER = RateLimiter(SHEETS_REQUESTS_PER_MINUTE / 60, SHEETS_REQUESTS_PER_MINUTE, "sheet.rate_limit")
+
+
+def _is_rate_limited(error):
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) == 429
+
+
+def with_backoff(request, *args, **kwargs):
+    """
+    Calls `request`, retrying with exponential backoff while the Sheets API returns 429.
+    Every attempt waits for SHEETS_RATE_LIMITER first.
+    """
+    from gspread.exceptions import APIError
+
+    delay = INITIAL_BACKOFF_SECONDS
+    for attempt in range(MAX_RETRIES + 1):
+        SHEETS_RATE_LIMITER.wait()
+        try:
+            return request(*args, **kwargs)
+        except APIError as e:
+            if not _is_rate_limited(e) or attempt == MAX_RETRIES:
+                raise
+            print(f"Google Sheets rate limit hit. Retrying in {delay}s...")
+            time.sleep(delay)
+            delay *= 2
+
+
+class SheetWriteBuffer:
+    """
+    Collects row appends and cell updates for a worksheet and sends them as
+    a small number of `append_rows`/`batch_update` requests.
+    Use as a context manager so pending writes are flushed on exit.
+    """
+
+    def __init__(self, sheet, batch_size=DEFAULT_BATCH_SIZE):
+        # gspread is loaded by the first buffer rather than on import, and not again per cell
+        from gspread.utils import rowcol_to_a1
+        self.rowcol_to_a1 = rowcol_to_a1
+        self.sheet = sheet
+        self.batch_size = max(1, int(batch_size))
+        self.pending_rows = []
+        self.pending_cells = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+        return False
+
+    def append_row(self, row_data):
+        self.pending_rows.append(list(row_data))
+        if len(self.pending_rows) >= self.batch_size:
+            self.flush_rows()
+
+    def update_cell(self, row, col, value):
+        self.pending_cells.append({'range': self.rowcol_to_a1(row, col), 'values': [[value]]})
+        if len(self.pending_cells) >= self.batch_size:
+            self.flush_cells()
+
+    def flush_rows(self):
+        while self.pending_rows:
+            batch = self.pending_rows[:self.batch_size]
+            with timed("sheet.append_rows"):
+                with_backoff(self.sheet.append_rows, batch)
+            del self.pending_rows[:len(batch)]
+
+    def flush_cells(self):
+        while self.pending_cells:
+            batch = self.pending_cells[:self.batch_size]
+            with timed("sheet.batch_update"):
+                with_backoff(self.sheet.batch_update, batch)
+            del self.pending_cells[:len(batch)]
+
+    def flush(self):
+        self.flush_rows()
+        self.flush_cells()
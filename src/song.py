@@ -1,4 +1,9 @@
 from datetime import datetime
+from typing import NamedTuple
+
+# Sheet layout: headers are on row 4 and data starts on row 5 (1-based)
+HEADER_ROW = 4
+DATA_START_ROW = 5
 
 
 class Song:
@@ -74,3 +79,39 @@ def getCurrentDatetime():
         "%B %d, %Y at %I:%M%p"
     )  # Format date as "January 29, 2024 at 01:05PM"
     return date_added
+
+
+class SheetRow(NamedTuple):
+    """A data row of the Google Sheet, carrying its position so duplicates stay distinct."""
+    index: int  # 0-based position among the data rows
+    title: str
+    artist: str
+    acquirement_status: str
+    triaged: str
+
+    @property
+    def sheet_row(self):
+        """1-based row number in the Google Sheet."""
+        return self.index + DATA_START_ROW
+
+
+def parseSheetRows(headers, data_rows):
+    """Builds a SheetRow for every data row. Raises ValueError if a required column is missing."""
+    title_col = headers.index('Title')
+    artist_col = headers.index('Artist')
+    acquirement_col = headers.index('Acquirement Status')
+    triaged_col = headers.index('Triaged')
+
+    def cell(row, col):
+        return row[col] if len(row) > col else ''
+
+    return [
+        SheetRow(
+            index,
+            cell(row, title_col),
+            cell(row, artist_col).strip(),
+            cell(row, acquirement_col),
+            cell(row, triaged_col),
+        )
+        for index, row in enumerate(data_rows)
+    ]
@@ -0,0 +1,134 @@
+# src/spotify_pages.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.profiling import profiled
+from src.rate_limit import RateLimiter
+
+# Maximum page size allowed by the Spotify saved tracks endpoint
+SPOTIFY_PAGE_LIMIT = 50
+# Maximum page size allowed by the Spotify playlist items endpoint
+PLAYLIST_PAGE_LIMIT = 100
+DEFAULT_FETCH_WORKERS = 4
+# Retry policy for rate-limited (HTTP 429) requests without a Retry-After header
+MAX_RETRIES = 5
+INITIAL_BACKOFF_SECONDS = 1
+# Spotify does not publish its limit (it is counted over a rolling 30 seconds). Requests from
+# every thread and job share this budget; a normal incremental backup fits in the burst.
+SPOTIFY_REQUESTS_PER_SECOND = 20
+SPOTIFY_BURST = 100
+SPOTIFY_RATE_LIMITER = RateLimiter(SPOTIFY_REQUESTS_PER_SECOND, SPOTIFY_BURST, "spotify.rate_limit")
+
+
+def _retry_after_seconds(error, default):
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return max(0, int(headers.get('Retry-After', default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _with_retry(request, description):
+    """Calls `request` through SPOTIFY_RATE_LIMITER, waiting out 429 responses as Spotify's Retry-After asks."""
+    from spotipy.exceptions import SpotifyException
+
+    delay = INITIAL_BACKOFF_SECONDS
+    for attempt in range(MAX_RETRIES + 1):
+        SPOTIFY_RATE_LIMITER.wait()
+        try:
+            return request()
+        except SpotifyException as e:
+            if e.http_status != 429 or attempt == MAX_RETRIES:
+                raise
+            wait = _retry_after_seconds(e, delay)
+            print(f"Spotify rate limit hit at {description}. Retrying in {wait}s...")
+            time.sleep(wait)
+            delay *= 2
+
+
+@profiled("spotify.page")
+def fetch_saved_tracks_page(sp, offset, limit=SPOTIFY_PAGE_LIMIT):
+    """Fetches one page of saved tracks."""
+    return _with_retry(lambda: sp.current_user_saved_tracks(limit=limit, offset=offset), f"offset {offset}")
+
+
+@profiled("spotify.playlist_page")
+def fetch_playlist_page(sp, playlist_id, offset, limit=PLAYLIST_PAGE_LIMIT):
+    """Fetches one page of a playlist's items."""
+    return _with_retry(
+        lambda: sp.playlist_items(playlist_id, limit=limit, offset=offset, additional_types=('track',)),
+        f"playlist {playlist_id} offset {offset}",
+    )
+
+
+def _fetch_all_pages(fetch_page, page_limit, workers, description):
+    """
+    Fetches every page of a paged endpoint, in order. The first page gives
+    the total; the remaining offsets are fetched concurrently on a pool of
+    `workers` threads and reassembled in offset order.
+    """
+    first_page = fetch_page(0)
+    total = first_page.get('total', len(first_page['items']))
+    offsets = range(page_limit, total, page_limit)
+    print(f"Fetching {total} {description} in {len(offsets) + 1} pages with {workers} workers...")
+
+    items = list(first_page['items'])
+    if offsets:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # map() yields pages in offset order regardless of completion order
+            for page in executor.map(fetch_page, offsets):
+                items.extend(page['items'])
+    return items
+
+
+def fetch_all_saved_tracks(sp, workers=DEFAULT_FETCH_WORKERS):
+    """Fetches every saved track, newest first, with concurrent page requests."""
+    items = _fetch_all_pages(lambda offset: fetch_saved_tracks_page(sp, offset), SPOTIFY_PAGE_LIMIT, workers, "liked songs")
+
+    # Songs liked while paging shift later offsets, which can repeat a track
+    unique_items = []
+    seen = set()
+    for item in items:
+        key = (item['track']['uri'], item['added_at'])
+        if key not in seen:
+            seen.add(key)
+            unique_items.append(item)
+    return unique_items
+
+
+def fetch_saved_tracks_since(sp, since=None, top=0):
+    """
+    Fetches saved tracks newest first, one page at a time, stopping at the
+    first track added at or before `since` (an ISO 8601 `added_at`; None for all)
+    or after `top` tracks (0 for no limit).
+    """
+    items = []
+    page_limit = min(top, SPOTIFY_PAGE_LIMIT) if top else SPOTIFY_PAGE_LIMIT
+    offset = 0
+    while True:
+        page = fetch_saved_tracks_page(sp, offset, page_limit)
+        for item in page['items']:
+            # added_at timestamps are ISO 8601 in UTC, so they compare as strings
+            if since and item['added_at'] <= since:
+                return items
+            items.append(item)
+            if top and len(items) >= top:
+                return items
+        if not page['next']:
+            return items
+        offset += len(page['items'])
+
+
+def fetch_all_playlist_items(sp, playlist_id, workers=DEFAULT_FETCH_WORKERS):
+    """
+    Fetches every track of a playlist, in playlist order, with concurrent page
+    requests. Removed tracks, local files and podcast episodes are skipped.
+    """
+    items = _fetch_all_pages(
+        lambda offset: fetch_playlist_page(sp, playlist_id, offset), PLAYLIST_PAGE_LIMIT, workers, "playlist tracks"
+    )
+    return [
+        item for item in items
+        if item.get('track') and item['track'].get('type', 'track') == 'track'
+        and not item.get('is_local') and item['track'].get('artists')
+    ]
@@ -0,0 +1,125 @@
+# src/tag_readers.py
+
+"""
+Tag readers for the audio formats found in a local music library.
+Each reader only parses the tag headers of a file (ID3 frames, FLAC metadata
+blocks, MP4 atoms, Ogg comment packets, RIFF chunks) and never decodes or
+reads through the audio stream. Readers return an (artist, title) tuple.
+"""
+
+import io
+import os
+import struct
+from mutagen.easyid3 import EasyID3
+from mutagen.flac import FLAC
+from mutagen.id3 import ID3
+from mutagen.mp4 import Atoms, MP4Tags
+from mutagen.ogg import OggPage
+from mutagen._vorbis import VCommentDict
+
+# Maps a lowercased file extension to its reader function
+TAG_READERS = {}
+
+def register_tag_reader(*extensions):
+    """Decorator registering a reader function for one or more file extensions."""
+    def decorator(reader):
+        for ext in extensions:
+            TAG_READERS[ext.lower()] = reader
+        return reader
+    return decorator
+
+def _first(values):
+    """Returns the first non-empty value of a tag list, or None."""
+    for value in values or []:
+        if value:
+            return str(value)
+    return None
+
+def read_tags(filepath):
+    """Reads (artist, title) from a file using the reader registered for its extension."""
+    reader = TAG_READERS.get(os.path.splitext(filepath)[1].lower())
+    if reader is None:
+        return None, None
+    return reader(filepath)
+
+
+@register_tag_reader('.mp3')
+def read_id3_tags(filepath):
+    tags = EasyID3(filepath)
+    return _first(tags.get('artist')), _first(tags.get('title'))
+
+
+@register_tag_reader('.flac')
+def read_flac_tags(filepath):
+    # FLAC only parses the metadata blocks in front of the first audio frame
+    tags = FLAC(filepath).tags or {}
+    return _first(tags.get('artist')), _first(tags.get('title'))
+
+
+@register_tag_reader('.m4a', '.mp4', '.aac')
+def read_mp4_tags(filepath):
+    with open(filepath, 'rb') as fileobj:
+        # Atoms walks the atom headers only and seeks over 'mdat'
+        atoms = Atoms(fileobj)
+        tags = MP4Tags(atoms, fileobj)
+    return _first(tags.get('\xa9ART')), _first(tags.get('\xa9nam'))
+
+
+@register_tag_reader('.ogg', '.oga', '.opus')
+def read_ogg_tags(filepath):
+    with open(filepath, 'rb') as fileobj:
+        # The first page holds the identification header, the comment header follows it
+        first_page = OggPage(fileobj)
+        pages = []
+        while True:
+            page = OggPage(fileobj)
+            if page.serial != first_page.serial:
+                continue
+            pages.append(page)
+            if page.complete or len(page.packets) > 1:
+                break
+    packet = OggPage.to_packets(pages, strict=False)[0]
+    if packet.startswith(b'\x03vorbis'):
+        tags = VCommentDict(packet[7:])
+    elif packet.startswith(b'OpusTags'):
+        tags = VCommentDict(packet[8:], framing=False)
+    else:
+        return None, None
+    return _first(tags.get('artist')), _first(tags.get('title'))
+
+
+@register_tag_reader('.wav', '.wave')
+def read_wav_tags(filepath):
+    """Reads the RIFF LIST/INFO chunk, falling back to an embedded ID3 chunk."""
+    info = {}
+    id3_data = None
+    with open(filepath, 'rb') as fileobj:
+        header = fileobj.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            return None, None
+        while True:
+            chunk_header = fileobj.read(8)
+            if len(chunk_header) < 8:
+                break
+            chunk_id, size = chunk_header[:4], struct.unpack('<I', chunk_header[4:])[0]
+            next_chunk = fileobj.tell() + size + (size & 1)
+            if chunk_id == b'LIST' and fileobj.read(4) == b'INFO':
+                data = fileobj.read(size - 4)
+                offset = 0
+                while offset + 8 <= len(data):
+                    sub_id = data[offset:offset + 4]
+                    sub_size = struct.unpack('<I', data[offset + 4:offset + 8])[0]
+                    value = data[offset + 8:offset + 8 + sub_size].split(b'\x00', 1)[0]
+                    info[sub_id] = value.decode('utf-8', errors='replace').strip()
+                    offset += 8 + sub_size + (sub_size & 1)
+            elif chunk_id in (b'id3 ', b'ID3 '):
+                id3_data = fileobj.read(size)
+            # Skips the 'data' chunk (and anything else) without reading it
+            fileobj.seek(next_chunk)
+
+    artist, title = info.get(b'IART') or None, info.get(b'INAM') or None
+    if (not artist or not title) and id3_data:
+        tags = ID3(io.BytesIO(id3_data))
+        artist = artist or _first(tags['TPE1'].text if 'TPE1' in tags else None)
+        title = title or _first(tags['TIT2'].text if 'TIT2' in tags else None)
+    return artist, title